@@ -3,6 +3,27 @@ DES (Data Encryption Standard) 算法手动实现
 不使用任何第三方加密库，从底层实现DES算法
 """
 
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # 未安装NumPy时只使用纯Python实现
+    np = None
+
+# 分组密码工作模式
+MODE_ECB = 'ECB'
+MODE_CBC = 'CBC'
+MODE_CTR = 'CTR'
+
+# 批量分组运算的实现方式
+BACKEND_AUTO = 'auto'
+BACKEND_PYTHON = 'python'
+BACKEND_NUMPY = 'numpy'
+
 
 class DES:
     """DES加密算法实现类"""
@@ -123,14 +144,15 @@ class DES:
         21, 13, 5, 28, 20, 12, 4
     ]
     
-    # 密钥置换选择2 (PC-2)
+    # 密钥置换选择2 (PC-2)，与 FIPS 46-3 一致
+    # （早期版本第5、6行抄录有误，生成的密文与标准DES不同，无法与其他实现互通）
     PC2 = [
         14, 17, 11, 24, 1, 5,
         3, 28, 15, 6, 21, 10,
         23, 19, 12, 4, 26, 8,
         16, 7, 27, 20, 13, 2,
-        41, 52, 31, 37, 46, 54,
-        29, 36, 45, 50, 38, 32,
+        41, 52, 31, 37, 47, 55,
+        30, 40, 51, 45, 33, 48,
         44, 49, 39, 56, 34, 53,
         46, 42, 50, 36, 29, 32
     ]
@@ -138,123 +160,322 @@ class DES:
     # 每轮密钥循环左移的位数
     SHIFT = [1, 1, 2, 2, 2, 2, 2, 2, 1, 2, 2, 2, 2, 2, 2, 1]
     
-    def __init__(self, key):
+    def __init__(self, key, mode=MODE_ECB, iv=None, backend=BACKEND_AUTO):
         """
         初始化DES对象
         :param key: 8字节密钥
+        :param mode: 工作模式，MODE_ECB / MODE_CBC / MODE_CTR
+        :param iv: 8字节初始向量（CBC）或计数器初值（CTR），ECB模式不使用
+        :param backend: 批量运算实现，BACKEND_AUTO（分组足够多且已安装NumPy时向量化）、
+                        BACKEND_PYTHON 或 BACKEND_NUMPY（未安装NumPy时退回纯Python）
         """
         if isinstance(key, str):
             key_bytes = key.encode('utf-8')
         else:
             key_bytes = bytes(key)
-        if len(key_bytes) != 8:
-            raise ValueError("DES密钥必须为8字节")
         self.key = key_bytes
-        self.sub_keys = self._generate_sub_keys()
-    
-    def _bytes_to_bits(self, data):
-        """将字节序列转换为比特列表"""
-        bits = []
-        for byte in data:
-            for i in range(7, -1, -1):
-                bits.append((byte >> i) & 1)
-        return bits
-    
-    def _bits_to_bytes(self, bits):
-        """将比特列表转换为字节序列"""
-        result = bytearray()
-        for i in range(0, len(bits), 8):
-            byte = 0
-            for j in range(8):
-                if i + j < len(bits):
-                    byte = (byte << 1) | bits[i + j]
-            result.append(byte)
-        return bytes(result)
-    
-    def _permute(self, block, table):
-        """根据置换表进行置换"""
-        return [block[i - 1] for i in table]
-    
-    def _xor(self, bits1, bits2):
-        """异或操作"""
-        return [b1 ^ b2 for b1, b2 in zip(bits1, bits2)]
-    
-    def _left_shift(self, bits, n):
-        """循环左移"""
-        return bits[n:] + bits[:n]
-    
-    def _generate_sub_keys(self):
-        """生成16个子密钥"""
-        # 将密钥转换为比特
-        key_bits = self._bytes_to_bits(self.key)
-        
-        # PC-1置换
-        key_bits = self._permute(key_bits, self.PC1)
+        self.sub_keys, self._round_keys, self._reversed_round_keys = self._key_schedule(key_bytes)
         
-        # 分为左右两部分
-        C = key_bits[:28]
-        D = key_bits[28:]
+        if mode not in (MODE_ECB, MODE_CBC, MODE_CTR):
+            raise ValueError(f"不支持的工作模式: {mode}")
+        self.mode = mode
+        if mode == MODE_ECB:
+            if iv is not None:
+                raise ValueError("ECB模式不使用初始向量")
+            self.iv = None
+        else:
+            if iv is None:
+                raise ValueError(f"{mode}模式必须提供8字节初始向量")
+            self.iv = iv.encode('utf-8') if isinstance(iv, str) else bytes(iv)
+            if len(self.iv) != 8:
+                raise ValueError("初始向量必须为8字节")
+        
+        if backend not in (BACKEND_AUTO, BACKEND_PYTHON, BACKEND_NUMPY):
+            raise ValueError(f"不支持的实现方式: {backend}")
+        self.backend = backend
+    
+    def _key_schedule(self, key):
+        """
+        获取密钥编排结果，取自进程内共享的密钥编排缓存
+        :param key: 8字节密钥
+        :return: (sub_keys, round_keys, reversed_round_keys)
+        """
+        if len(key) != 8:
+            raise ValueError("DES密钥必须为8字节")
+        return KEY_SCHEDULE_CACHE.get(key)
+    
+    @staticmethod
+    def _generate_sub_keys(key):
+        """
+        生成16个48位整数子密钥
+        :param key: 8字节密钥
+        :return: 子密钥列表
+        """
+        pc2 = PC2_PERMUTATION
+        
+        # PC-1置换（64位 -> 56位）
+        key = PC1_PERMUTATION(int.from_bytes(key, 'big'))
+        
+        # 分为左右两部分（各28位）
+        C = key >> 28
+        D = key & 0xFFFFFFF
         
         sub_keys = []
-        for i in range(16):
-            # 循环左移
-            C = self._left_shift(C, self.SHIFT[i])
-            D = self._left_shift(D, self.SHIFT[i])
+        for shift in DES.SHIFT:
+            # 28位循环左移
+            C = ((C << shift) | (C >> (28 - shift))) & 0xFFFFFFF
+            D = ((D << shift) | (D >> (28 - shift))) & 0xFFFFFFF
             
-            # PC-2置换
-            sub_key = self._permute(C + D, self.PC2)
-            sub_keys.append(sub_key)
+            # PC-2置换（56位 -> 48位）
+            sub_keys.append(pc2((C << 28) | D))
         
         return sub_keys
     
-    def _f_function(self, right, sub_key):
-        """F函数"""
-        # E扩展
-        expanded = self._permute(right, self.E)
+    def _process_block(self, block, round_keys):
+        """
+        处理一个64位数据块
+        :param block: 64位整数数据块
+        :param round_keys: 由 _split_sub_keys 得到的轮密钥序列
+        :return: 64位整数
+        """
+        sp0, sp1, sp2, sp3, sp4, sp5, sp6, sp7 = SP_BOX
+        ip0, ip1, ip2, ip3, ip4, ip5, ip6, ip7 = IP_PERMUTATION.lookups
+        fp0, fp1, fp2, fp3, fp4, fp5, fp6, fp7 = FP_PERMUTATION.lookups
         
-        # 与子密钥异或
-        xored = self._xor(expanded, sub_key)
+        # 初始置换（按字节查表）
+        block = (ip0[block >> 56] | ip1[(block >> 48) & 0xFF] |
+                 ip2[(block >> 40) & 0xFF] | ip3[(block >> 32) & 0xFF] |
+                 ip4[(block >> 24) & 0xFF] | ip5[(block >> 16) & 0xFF] |
+                 ip6[(block >> 8) & 0xFF] | ip7[block & 0xFF])
         
-        # S盒替换
-        output = []
-        for i in range(8):
-            # 6位一组
-            block = xored[i * 6:(i + 1) * 6]
-            
-            # 计算行和列
-            row = (block[0] << 1) | block[5]
-            col = (block[1] << 3) | (block[2] << 2) | (block[3] << 1) | block[4]
-            
-            # S盒查找
-            val = self.S_BOX[i][row][col]
-            
-            # 转换为4位
-            for j in range(3, -1, -1):
-                output.append((val >> j) & 1)
+        # 分为左右两部分
+        left = block >> 32
+        right = block & 0xFFFFFFFF
+        
+        # 16轮迭代（F函数内联展开，每次循环处理两轮以省去左右交换）
+        keys = iter(round_keys)
+        for (key_a, key_b), (key_c, key_d) in zip(keys, keys):
+            t = ((right & 1) << 33) | (right << 1) | (right >> 31)
+            a = t ^ key_a
+            b = t ^ key_b
+            left ^= (sp0[a >> 28] | sp2[(a >> 20) & 0x3F] |
+                     sp4[(a >> 12) & 0x3F] | sp6[(a >> 4) & 0x3F] |
+                     sp1[(b >> 24) & 0x3F] | sp3[(b >> 16) & 0x3F] |
+                     sp5[(b >> 8) & 0x3F] | sp7[b & 0x3F])
+            t = ((left & 1) << 33) | (left << 1) | (left >> 31)
+            a = t ^ key_c
+            b = t ^ key_d
+            right ^= (sp0[a >> 28] | sp2[(a >> 20) & 0x3F] |
+                      sp4[(a >> 12) & 0x3F] | sp6[(a >> 4) & 0x3F] |
+                      sp1[(b >> 24) & 0x3F] | sp3[(b >> 16) & 0x3F] |
+                      sp5[(b >> 8) & 0x3F] | sp7[b & 0x3F])
+        
+        # 交换左右后逆初始置换（按字节查表）
+        block = (right << 32) | left
+        return (fp0[block >> 56] | fp1[(block >> 48) & 0xFF] |
+                fp2[(block >> 40) & 0xFF] | fp3[(block >> 32) & 0xFF] |
+                fp4[(block >> 24) & 0xFF] | fp5[(block >> 16) & 0xFF] |
+                fp6[(block >> 8) & 0xFF] | fp7[block & 0xFF])
+    
+    def _use_numpy(self, count):
+        """
+        判断处理count个分组时是否使用NumPy向量化实现
+        :param count: 分组个数
+        """
+        if np is None or self.backend == BACKEND_PYTHON:
+            return False
+        return self.backend == BACKEND_NUMPY or count >= _NUMPY_MIN_BLOCKS
+    
+    def _process_blocks(self, data, round_keys):
+        """
+        逐块处理长度为8的整数倍的数据（ECB）
+        :param data: 字节串、bytearray或memoryview
+        :param round_keys: 轮密钥序列
+        :return: 处理结果字节串
+        """
+        data = memoryview(data)
+        output = bytearray()
+        
+        if self._use_numpy(len(data) // 8):
+            for start in range(0, len(data), _NUMPY_BATCH_BYTES):
+                blocks = np.frombuffer(data[start:start + _NUMPY_BATCH_BYTES], dtype='>u8').astype(np.uint64)
+                output += _numpy_process_blocks(blocks, round_keys).astype('>u8').tobytes()
+            return bytes(output)
         
-        # P置换
-        return self._permute(output, self.P)
+        # 分批解包为64位整数，避免为整段数据生成中间列表
+        process_block = self._process_block
+        for start in range(0, len(data), _BATCH_BYTES):
+            batch = data[start:start + _BATCH_BYTES]
+            count = len(batch) // 8
+            blocks = struct.unpack(f'>{count}Q', batch)
+            output += struct.pack(f'>{count}Q', *[process_block(block, round_keys) for block in blocks])
+        return bytes(output)
     
-    def _process_block(self, block, sub_keys):
-        """处理一个64位数据块"""
-        # 初始置换
-        block = self._permute(block, self.IP)
+    def _cbc_encrypt(self, data, previous):
+        """
+        CBC加密：每个明文分组先与上一密文分组异或再加密
+        :param data: 长度为8的整数倍的数据
+        :param previous: 上一密文分组（首块为初始向量）
+        :return: (密文, 最后一个密文分组)
+        """
+        process_block = self._process_block
+        round_keys = self._round_keys
+        output = bytearray()
         
-        # 分为左右两部分
-        left = block[:32]
-        right = block[32:]
+        for start in range(0, len(data), _BATCH_BYTES):
+            batch = data[start:start + _BATCH_BYTES]
+            count = len(batch) // 8
+            results = []
+            for block in struct.unpack(f'>{count}Q', batch):
+                previous = process_block(block ^ previous, round_keys)
+                results.append(previous)
+            output += struct.pack(f'>{count}Q', *results)
+        return bytes(output), previous
+    
+    def _cbc_decrypt(self, data, previous):
+        """
+        CBC解密：每个分组解密后与上一密文分组异或
+        :param data: 长度为8的整数倍的数据
+        :param previous: 上一密文分组（首块为初始向量）
+        :return: (明文, 最后一个密文分组)
+        """
+        data = memoryview(data)
+        round_keys = self._reversed_round_keys
+        output = bytearray()
+        
+        if self._use_numpy(len(data) // 8):
+            # 各分组的解密互不依赖，可整体向量化后再与前一密文分组异或
+            for start in range(0, len(data), _NUMPY_BATCH_BYTES):
+                blocks = np.frombuffer(data[start:start + _NUMPY_BATCH_BYTES], dtype='>u8').astype(np.uint64)
+                chained = np.empty_like(blocks)
+                chained[0] = previous
+                chained[1:] = blocks[:-1]
+                output += (_numpy_process_blocks(blocks, round_keys) ^ chained).astype('>u8').tobytes()
+                previous = int(blocks[-1])
+            return bytes(output), previous
         
-        # 16轮迭代
-        for i in range(16):
-            temp = right[:]
-            right = self._xor(left, self._f_function(right, sub_keys[i]))
-            left = temp
+        process_block = self._process_block
+        for start in range(0, len(data), _BATCH_BYTES):
+            batch = data[start:start + _BATCH_BYTES]
+            count = len(batch) // 8
+            results = []
+            for block in struct.unpack(f'>{count}Q', batch):
+                results.append(process_block(block, round_keys) ^ previous)
+                previous = block
+            output += struct.pack(f'>{count}Q', *results)
+        return bytes(output), previous
+    
+    def keystream(self, start_block, count):
+        """
+        批量生成CTR模式的密钥流
+        第i个分组的密钥流为 E(iv + i mod 2^64)，各分组互不依赖，可按分组序号切分给多个工作者
+        :param start_block: 起始分组序号
+        :param count: 分组个数
+        :return: count * 8 字节的密钥流
+        """
+        if self.mode != MODE_CTR:
+            raise ValueError("只有CTR模式可以生成密钥流")
+        counter = int.from_bytes(self.iv, 'big') + start_block
+        
+        if self._use_numpy(count):
+            # uint64加法自然按2^64回绕
+            counters = np.arange(count, dtype=np.uint64) + np.uint64(counter & 0xFFFFFFFFFFFFFFFF)
+            return _numpy_process_blocks(counters, self._round_keys).astype('>u8').tobytes()
         
-        # 交换左右
-        combined = right + left
+        process_block = self._process_block
+        round_keys = self._round_keys
+        blocks = [process_block((counter + i) & 0xFFFFFFFFFFFFFFFF, round_keys) for i in range(count)]
+        return struct.pack(f'>{count}Q', *blocks)
+    
+    def _ctr_xor(self, data, start_block):
+        """
+        CTR加解密：数据与密钥流异或，长度可以不是8的整数倍
+        :param data: 任意长度数据
+        :param start_block: data首字节所在的分组序号
+        :return: (结果, 下一个分组序号)
+        """
+        output = bytearray()
         
-        # 逆初始置换
-        return self._permute(combined, self.FP)
+        for start in range(0, len(data), _BATCH_BYTES):
+            batch = data[start:start + _BATCH_BYTES]
+            size = len(batch)
+            count = (size + 7) // 8
+            stream = self.keystream(start_block, count)[:size]
+            output += (int.from_bytes(batch, 'big') ^ int.from_bytes(stream, 'big')).to_bytes(size, 'big')
+            start_block += count
+        return bytes(output), start_block
+    
+    def _initial_state(self):
+        """工作模式的初始链接状态：CBC为初始向量，CTR为分组序号0"""
+        if self.mode == MODE_CBC:
+            return int.from_bytes(self.iv, 'big')
+        if self.mode == MODE_CTR:
+            return 0
+        return None
+    
+    def _encrypt_blocks(self, data, state):
+        """
+        按工作模式加密
+        :param data: 待加密数据（ECB/CBC下须为8字节的整数倍）
+        :param state: 链接状态，见 _initial_state
+        :return: (密文, 新状态)
+        """
+        if self.mode == MODE_CBC:
+            return self._cbc_encrypt(data, state)
+        if self.mode == MODE_CTR:
+            return self._ctr_xor(data, state)
+        return self._process_blocks(data, self._round_keys), state
+    
+    def _decrypt_blocks(self, data, state):
+        """
+        按工作模式解密
+        :param data: 待解密数据（ECB/CBC下须为8字节的整数倍）
+        :param state: 链接状态，见 _initial_state
+        :return: (明文, 新状态)
+        """
+        if self.mode == MODE_CBC:
+            return self._cbc_decrypt(data, state)
+        if self.mode == MODE_CTR:
+            return self._ctr_xor(data, state)
+        return self._process_blocks(data, self._reversed_round_keys), state
+    
+    def encrypt_bytes(self, data):
+        """
+        加密二进制数据
+        :param data: 明文（bytes、bytearray或memoryview，不会复制整段输入）
+        :return: 密文字节串
+        """
+        data = memoryview(data).cast('B')
+        state = self._initial_state()
+        
+        # CTR为流模式，不需要填充
+        if self.mode == MODE_CTR:
+            return self._encrypt_blocks(data, state)[0]
+        
+        # ECB/CBC：完整分组直接从输入视图读取，只有末尾不足一个分组的部分与PKCS#7填充拼接
+        full = len(data) - len(data) % 8
+        body, state = self._encrypt_blocks(data[:full], state)
+        tail, _ = self._encrypt_blocks(_pad(bytes(data[full:])), state)
+        return body + tail
+    
+    def decrypt_bytes(self, data):
+        """
+        解密二进制数据
+        :param data: 密文（bytes、bytearray或memoryview，不会复制整段输入）
+        :return: 明文字节串
+        """
+        data = memoryview(data).cast('B')
+        if self.mode != MODE_CTR and len(data) % 8 != 0:
+            raise ValueError("密文长度不是8字节的整数倍")
+        if not data:
+            return b''
+        
+        plaintext, _ = self._decrypt_blocks(data, self._initial_state())
+        
+        # ECB/CBC移除PKCS#7填充
+        if self.mode != MODE_CTR:
+            plaintext = _unpad(plaintext)
+        return plaintext
     
     def encrypt(self, plaintext):
         """
@@ -263,35 +484,9 @@ class DES:
         :return: 加密后的十六进制字符串
         """
         if isinstance(plaintext, str):
-            plaintext_bytes = plaintext.encode('utf-8')
-        else:
-            plaintext_bytes = bytes(plaintext)
-        
-        # PKCS#7填充
-        pad_len = 8 - (len(plaintext_bytes) % 8)
-        if pad_len == 0:
-            pad_len = 8
-        plaintext_bytes += bytes([pad_len] * pad_len)
-        
-        ciphertext_bits = []
-        
-        # 分块加密
-        for i in range(0, len(plaintext_bytes), 8):
-            block = plaintext_bytes[i:i + 8]
-            block_bits = self._bytes_to_bits(block)
-            encrypted_block = self._process_block(block_bits, self.sub_keys)
-            ciphertext_bits.extend(encrypted_block)
-        
-        # 转换为十六进制
-        hex_str = ''
-        for i in range(0, len(ciphertext_bits), 4):
-            val = 0
-            for j in range(4):
-                if i + j < len(ciphertext_bits):
-                    val = (val << 1) | ciphertext_bits[i + j]
-            hex_str += format(val, 'X')
-        
-        return hex_str
+            plaintext = plaintext.encode('utf-8')
+        
+        return self.encrypt_bytes(plaintext).hex().upper()
     
     def decrypt(self, ciphertext_hex):
         """
@@ -299,37 +494,502 @@ class DES:
         :param ciphertext_hex: 十六进制密文字符串
         :return: 解密后的明文字符串
         """
-        # 将十六进制转换为比特
-        ciphertext_bits = []
-        for hex_char in ciphertext_hex:
-            val = int(hex_char, 16)
-            for i in range(3, -1, -1):
-                ciphertext_bits.append((val >> i) & 1)
+        if self.mode == MODE_CTR:
+            ciphertext = bytes.fromhex(ciphertext_hex)
+        else:
+            # 不足一个分组（16个十六进制字符）的尾部忽略
+            usable = len(ciphertext_hex) - len(ciphertext_hex) % 16
+            ciphertext = bytes.fromhex(ciphertext_hex[:usable])
+        
+        return self.decrypt_bytes(ciphertext).decode('utf-8')
+
+
+class TripleDES(DES):
+    """
+    三重DES（EDE）实现类
+    密文 = E_K3(D_K2(E_K1(明文)))。三段子密钥预先拼成一个48轮的轮密钥序列，
+    相邻两次DES之间的FP与IP互逆，可以直接省去，每个分组只做一次IP和一次FP
+    """
+    
+    def _key_schedule(self, key):
+        """
+        生成48轮的EDE轮密钥序列
+        :param key: 16字节（K1、K2，K3 = K1）或24字节（K1、K2、K3）密钥
+        :return: (sub_keys, round_keys, reversed_round_keys)
+        """
+        if len(key) not in (16, 24):
+            raise ValueError("三重DES密钥必须为16或24字节")
+        k1, k2 = key[:8], key[8:16]
+        k3 = key[16:] if len(key) == 24 else k1
         
-        plaintext_bytes = bytearray()
+        sub1, round1, _ = KEY_SCHEDULE_CACHE.get(k1)
+        sub2, round2, reversed2 = KEY_SCHEDULE_CACHE.get(k2)
+        sub3, round3, _ = KEY_SCHEDULE_CACHE.get(k3)
         
-        # 使用逆序的子密钥进行解密
-        reversed_keys = self.sub_keys[::-1]
+        # 加密：K1加密、K2解密（逆序子密钥）、K3加密；整体逆序即为解密的 D_K1(E_K2(D_K3(...)))
+        sub_keys = sub1 + sub2[::-1] + sub3
+        round_keys = round1 + reversed2 + round3
+        return sub_keys, round_keys, round_keys[::-1]
+    
+    def _process_block(self, block, round_keys):
+        """
+        处理一个64位数据块（48轮）
+        :param block: 64位整数数据块
+        :param round_keys: 48轮的轮密钥序列
+        :return: 64位整数
+        """
+        sp0, sp1, sp2, sp3, sp4, sp5, sp6, sp7 = SP_BOX
+        ip0, ip1, ip2, ip3, ip4, ip5, ip6, ip7 = IP_PERMUTATION.lookups
+        fp0, fp1, fp2, fp3, fp4, fp5, fp6, fp7 = FP_PERMUTATION.lookups
         
-        # 分块解密
-        for i in range(0, len(ciphertext_bits), 64):
-            block = ciphertext_bits[i:i + 64]
-            if len(block) == 64:
-                decrypted_block_bits = self._process_block(block, reversed_keys)
-                plaintext_bytes.extend(self._bits_to_bytes(decrypted_block_bits))
+        # 只在开头做一次初始置换
+        block = (ip0[block >> 56] | ip1[(block >> 48) & 0xFF] |
+                 ip2[(block >> 40) & 0xFF] | ip3[(block >> 32) & 0xFF] |
+                 ip4[(block >> 24) & 0xFF] | ip5[(block >> 16) & 0xFF] |
+                 ip6[(block >> 8) & 0xFF] | ip7[block & 0xFF])
         
-        if not plaintext_bytes:
-            return ''
+        # 每段开头统一交换左右，这里先反向放置，第一段交换后即为 (L0, R0)
+        right = block >> 32
+        left = block & 0xFFFFFFFF
         
-        # 移除PKCS#7填充
-        pad_len = plaintext_bytes[-1]
-        if pad_len < 1 or pad_len > 8:
-            raise ValueError("解密填充无效")
-        if plaintext_bytes[-pad_len:] != bytes([pad_len] * pad_len):
-            raise ValueError("解密填充校验失败")
-        plaintext_bytes = plaintext_bytes[:-pad_len]
+        for segment in (round_keys[:16], round_keys[16:32], round_keys[32:]):
+            # 上一次DES末尾的左右交换（下一次DES的输入）
+            left, right = right, left
+            keys = iter(segment)
+            for (key_a, key_b), (key_c, key_d) in zip(keys, keys):
+                t = ((right & 1) << 33) | (right << 1) | (right >> 31)
+                a = t ^ key_a
+                b = t ^ key_b
+                left ^= (sp0[a >> 28] | sp2[(a >> 20) & 0x3F] |
+                         sp4[(a >> 12) & 0x3F] | sp6[(a >> 4) & 0x3F] |
+                         sp1[(b >> 24) & 0x3F] | sp3[(b >> 16) & 0x3F] |
+                         sp5[(b >> 8) & 0x3F] | sp7[b & 0x3F])
+                t = ((left & 1) << 33) | (left << 1) | (left >> 31)
+                a = t ^ key_c
+                b = t ^ key_d
+                right ^= (sp0[a >> 28] | sp2[(a >> 20) & 0x3F] |
+                          sp4[(a >> 12) & 0x3F] | sp6[(a >> 4) & 0x3F] |
+                          sp1[(b >> 24) & 0x3F] | sp3[(b >> 16) & 0x3F] |
+                          sp5[(b >> 8) & 0x3F] | sp7[b & 0x3F])
         
-        return plaintext_bytes.decode('utf-8')
+        # 最后一次DES交换左右后做一次逆初始置换
+        block = (right << 32) | left
+        return (fp0[block >> 56] | fp1[(block >> 48) & 0xFF] |
+                fp2[(block >> 40) & 0xFF] | fp3[(block >> 32) & 0xFF] |
+                fp4[(block >> 24) & 0xFF] | fp5[(block >> 16) & 0xFF] |
+                fp6[(block >> 8) & 0xFF] | fp7[block & 0xFF])
+
+
+class DESEncryptor:
+    """
+    DES流式加密器
+    多次调用 update() 送入明文，只缓存不足一个分组的尾部，
+    finalize() 时处理尾部（ECB/CBC补PKCS#7填充），输出与 DES.encrypt 的密文字节一致
+    """
+    
+    def __init__(self, key, mode=MODE_ECB, iv=None):
+        """
+        初始化加密器
+        :param key: 8字节密钥，或DES对象（此时沿用其工作模式与初始向量）
+        :param mode: 工作模式
+        :param iv: 初始向量或计数器初值
+        """
+        self._des = key if isinstance(key, DES) else DES(key, mode, iv)
+        self._state = self._des._initial_state()
+        self._buffer = bytearray()
+        self._finalized = False
+    
+    def _transform(self, data):
+        """加密若干分组并推进链接状态"""
+        output, self._state = self._des._encrypt_blocks(data, self._state)
+        return output
+    
+    def update(self, data):
+        """
+        送入一段明文
+        :param data: 明文片段（字符串，或bytes、bytearray、memoryview等支持缓冲区协议的对象）
+        :return: 本次可输出的密文字节串
+        """
+        if self._finalized:
+            raise ValueError("加密器已结束，不能继续写入")
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        
+        return _update_blocks(self._transform, self._buffer, memoryview(data).cast('B'), 0)
+    
+    def finalize(self):
+        """
+        结束加密，处理缓存的尾部
+        :return: 最后的密文字节串
+        """
+        if self._finalized:
+            raise ValueError("加密器已结束")
+        self._finalized = True
+        
+        tail = bytes(self._buffer)
+        self._buffer.clear()
+        if self._des.mode != MODE_CTR:
+            tail = _pad(tail)
+        return self._transform(tail)
+
+
+class DESDecryptor:
+    """
+    DES流式解密器
+    多次调用 update() 送入密文；ECB/CBC下始终保留最后一个分组直到 finalize()，
+    以便校验并去除PKCS#7填充，输出与 DES.decrypt 的明文字节一致
+    """
+    
+    def __init__(self, key, mode=MODE_ECB, iv=None):
+        """
+        初始化解密器
+        :param key: 8字节密钥，或DES对象（此时沿用其工作模式与初始向量）
+        :param mode: 工作模式
+        :param iv: 初始向量或计数器初值
+        """
+        self._des = key if isinstance(key, DES) else DES(key, mode, iv)
+        self._state = self._des._initial_state()
+        self._buffer = bytearray()
+        self._finalized = False
+    
+    def _transform(self, data):
+        """解密若干分组并推进链接状态"""
+        output, self._state = self._des._decrypt_blocks(data, self._state)
+        return output
+    
+    def update(self, data):
+        """
+        送入一段密文
+        :param data: 密文片段（bytes、bytearray、memoryview等支持缓冲区协议的对象）
+        :return: 本次可输出的明文字节串
+        """
+        if self._finalized:
+            raise ValueError("解密器已结束，不能继续写入")
+        
+        reserve = 0 if self._des.mode == MODE_CTR else 8
+        return _update_blocks(self._transform, self._buffer, memoryview(data).cast('B'), reserve)
+    
+    def finalize(self):
+        """
+        结束解密，处理缓存的尾部（ECB/CBC校验并去除填充）
+        :return: 最后的明文字节串
+        """
+        if self._finalized:
+            raise ValueError("解密器已结束")
+        self._finalized = True
+        
+        tail = bytes(self._buffer)
+        self._buffer.clear()
+        if self._des.mode == MODE_CTR:
+            return self._transform(tail)
+        if not tail:
+            return b''
+        if len(tail) != 8:
+            raise ValueError("密文长度不是8字节的整数倍")
+        return _unpad(self._transform(tail))
+
+
+def _update_blocks(transform, buffer, data, reserve):
+    """
+    流式处理的公共部分：拼接缓存后处理完整分组，剩余部分留在缓存
+    :param transform: 处理若干完整分组的函数
+    :param buffer: 缓存（bytearray，原地修改）
+    :param data: 新数据（memoryview）
+    :param reserve: 数据恰好按分组对齐时需额外保留的字节数（解密时保留最后一个分组）
+    :return: 处理结果字节串
+    """
+    total = len(buffer) + len(data)
+    keep = total % 8 or min(reserve, total)
+    usable = total - keep
+    if usable <= 0:
+        buffer += data
+        return b''
+    
+    output = b''
+    if buffer:
+        # 先补齐缓存中的半个分组
+        fill = 8 - len(buffer)
+        buffer += data[:fill]
+        data = data[fill:]
+        usable -= 8
+        output = transform(buffer)
+        buffer.clear()
+    
+    output += transform(data[:usable])
+    buffer += data[usable:]
+    return output
+
+
+def _pad(data):
+    """PKCS#7填充到8字节的整数倍"""
+    pad_len = 8 - (len(data) % 8)
+    return data + bytes([pad_len] * pad_len)
+
+
+def _unpad(data):
+    """校验并移除PKCS#7填充"""
+    pad_len = data[-1]
+    if pad_len < 1 or pad_len > 8:
+        raise ValueError("解密填充无效")
+    if data[-pad_len:] != bytes([pad_len] * pad_len):
+        raise ValueError("解密填充校验失败")
+    return data[:-pad_len]
+
+
+class BitPermutation:
+    """
+    编译后的比特置换
+    将置换表预先编译为按输入字节索引的掩码表：lookups[j][b] 是输入第j个字节
+    （从最高字节起）取值为b时，这些比特置换到输出后的位置掩码。
+    一次置换只需对每个输入字节查一次表再按位或，不再逐位索引
+    """
+    
+    def __init__(self, table, width):
+        """
+        编译置换表
+        :param table: 置换表，第k项为输出第k位取自输入的第几位（从1开始、最高位为第1位）
+        :param width: 输入整数的位数
+        """
+        self.table = tuple(table)
+        self.width = width
+        self.out_width = len(self.table)
+        
+        # 输入第pos位在输出中对应的掩码（一个输入位可能出现在多个输出位置，如E扩展）
+        bit_masks = [0] * (width + 1)
+        for index, pos in enumerate(self.table):
+            if not 1 <= pos <= width:
+                raise ValueError(f"置换表位置 {pos} 超出输入位数 {width}")
+            bit_masks[pos] |= 1 << (self.out_width - 1 - index)
+        
+        self.shifts = tuple(range((width - 1) // 8 * 8, -1, -8))
+        self.lookups = tuple(self._build_lookup(bit_masks, shift) for shift in self.shifts)
+    
+    def _build_lookup(self, bit_masks, shift):
+        """生成输入中从shift位开始的那个字节的256项掩码表"""
+        # 该字节第i位（从最低位数）对应的输入位置
+        masks = [bit_masks[self.width - shift - i] if shift + i < self.width else 0
+                 for i in range(8)]
+        lookup = [0] * 256
+        for value in range(1, 256):
+            # 去掉最低的置位比特后复用已算好的结果
+            low = value & -value
+            lookup[value] = lookup[value ^ low] | masks[low.bit_length() - 1]
+        return tuple(lookup)
+    
+    def __call__(self, value):
+        """
+        对整数执行置换
+        :param value: width位整数
+        :return: out_width位整数
+        """
+        result = 0
+        for shift, lookup in zip(self.shifts, self.lookups):
+            result |= lookup[(value >> shift) & 0xFF]
+        return result
+
+
+_PERMUTATION_CACHE = {}
+
+
+def compile_permutation(table, width):
+    """
+    编译置换表，相同的表与位数只编译一次
+    :param table: 置换表（位置从1开始、最高位为第1位）
+    :param width: 输入整数的位数
+    :return: BitPermutation 对象，可直接调用
+    """
+    cache_key = (tuple(table), width)
+    permutation = _PERMUTATION_CACHE.get(cache_key)
+    if permutation is None:
+        permutation = BitPermutation(table, width)
+        _PERMUTATION_CACHE[cache_key] = permutation
+    return permutation
+
+
+def _split_sub_keys(sub_keys):
+    """
+    将48位子密钥拆成与E扩展中间值对齐的两个整数，供 _process_block 使用
+    第0、2、4、6组6位放入key_a，第1、3、5、7组放入key_b，第i组左移 28 - 4i 位
+    :param sub_keys: 48位整数子密钥序列
+    :return: (key_a, key_b) 元组列表
+    """
+    round_keys = []
+    for sub_key in sub_keys:
+        key_a = key_b = 0
+        for i in range(8):
+            group = ((sub_key >> (42 - 6 * i)) & 0x3F) << (28 - 4 * i)
+            if i % 2 == 0:
+                key_a |= group
+            else:
+                key_b |= group
+        round_keys.append((key_a, key_b))
+    return round_keys
+
+
+def _build_sp_box():
+    """
+    预计算8张64项的SP表，将S盒替换与P置换合并为一次查表
+    SP_BOX[i][v] 为第i个S盒输入6位v时，其4位输出经P置换后的32位结果
+    """
+    sp_box = []
+    for i, s_box in enumerate(DES.S_BOX):
+        table = []
+        for v in range(64):
+            row = ((v >> 4) & 2) | (v & 1)
+            col = (v >> 1) & 0xF
+            table.append(P_PERMUTATION(s_box[row][col] << (28 - 4 * i)))
+        sp_box.append(table)
+    return sp_box
+
+
+# 批量解包/打包时每批处理的字节数
+_BATCH_BYTES = 64 * 1024
+
+# 自动选择实现时，达到该分组数才使用NumPy（分组太少时向量化的固定开销更大）
+_NUMPY_MIN_BLOCKS = 64
+# NumPy实现每批处理的字节数
+_NUMPY_BATCH_BYTES = 1 << 20
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class KeyScheduleCache:
+    """
+    进程内共享的DES密钥编排LRU缓存
+    以8字节密钥为键，缓存 (子密钥, 加密轮密钥, 解密轮密钥)，
+    反复使用同一密钥创建DES对象时不必重新进行密钥编排
+    """
+    
+    def __init__(self, maxsize=256):
+        """
+        初始化缓存
+        :param maxsize: 最多缓存的密钥个数，为0时不缓存
+        """
+        self._schedules = OrderedDict()
+        self._lock = threading.Lock()
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        """
+        获取密钥对应的编排结果，未命中时计算并缓存
+        :param key: 8字节密钥
+        :return: (sub_keys, round_keys, reversed_round_keys)，均为元组
+        """
+        with self._lock:
+            schedule = self._schedules.get(key)
+            if schedule is not None:
+                self._schedules.move_to_end(key)
+                self.hits += 1
+                return schedule
+            self.misses += 1
+        
+        sub_keys = tuple(DES._generate_sub_keys(key))
+        round_keys = tuple(_split_sub_keys(sub_keys))
+        schedule = (sub_keys, round_keys, round_keys[::-1])
+        
+        with self._lock:
+            if self._maxsize > 0:
+                self._schedules[key] = schedule
+                self._evict()
+        return schedule
+    
+    def resize(self, maxsize):
+        """
+        调整缓存容量，超出部分按最近最少使用淘汰
+        :param maxsize: 新的容量
+        """
+        if maxsize < 0:
+            raise ValueError("缓存容量不能为负数")
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+    
+    def clear(self):
+        """清空缓存与命中统计"""
+        with self._lock:
+            self._schedules.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def cache_info(self):
+        """
+        返回缓存统计信息
+        :return: CacheInfo(hits, misses, maxsize, currsize)
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self._maxsize, len(self._schedules))
+    
+    def _evict(self):
+        """淘汰最久未使用的条目直到不超过容量"""
+        while len(self._schedules) > self._maxsize:
+            self._schedules.popitem(last=False)
+
+
+KEY_SCHEDULE_CACHE = KeyScheduleCache()
+
+IP_PERMUTATION = compile_permutation(DES.IP, 64)
+FP_PERMUTATION = compile_permutation(DES.FP, 64)
+P_PERMUTATION = compile_permutation(DES.P, 32)
+PC1_PERMUTATION = compile_permutation(DES.PC1, 64)
+PC2_PERMUTATION = compile_permutation(DES.PC2, 56)
+
+SP_BOX = _build_sp_box()
+
+# NumPy版的置换与SP表，首次使用时构建
+_NUMPY_TABLES = None
+
+
+def _numpy_tables():
+    """将IP/FP字节查找表与SP表转换为NumPy数组"""
+    global _NUMPY_TABLES
+    if _NUMPY_TABLES is None:
+        _NUMPY_TABLES = (
+            [np.array(lookup, dtype=np.uint64) for lookup in IP_PERMUTATION.lookups],
+            [np.array(lookup, dtype=np.uint64) for lookup in FP_PERMUTATION.lookups],
+            [np.array(table, dtype=np.uint64) for table in SP_BOX],
+        )
+    return _NUMPY_TABLES
+
+
+def _numpy_process_blocks(blocks, round_keys):
+    """
+    用NumPy向量化地对一批分组执行DES，与 DES._process_block 逐位一致
+    每一步（IP、E扩展、查SP表、异或、FP）都同时作用于整批分组
+    轮密钥多于16轮时（三重DES），每16轮之间补一次左右交换，相当于相邻两次DES之间的FP/IP
+    :param blocks: uint64数组，每个元素一个64位分组
+    :param round_keys: 轮密钥序列，长度为16的整数倍
+    :return: uint64数组
+    """
+    ip_tables, fp_tables, (sp0, sp1, sp2, sp3, sp4, sp5, sp6, sp7) = _numpy_tables()
+    
+    # 初始置换：按字节查表后按位或
+    block = np.zeros_like(blocks)
+    for shift, lookup in zip(IP_PERMUTATION.shifts, ip_tables):
+        block |= lookup[(blocks >> shift) & 0xFF]
+    
+    left = block >> 32
+    right = block & 0xFFFFFFFF
+    
+    # 逐轮迭代，各分组同时进行
+    for index, (key_a, key_b) in enumerate(round_keys, 1):
+        t = ((right & 1) << 33) | (right << 1) | (right >> 31)
+        a = t ^ np.uint64(key_a)
+        b = t ^ np.uint64(key_b)
+        left ^= (sp0[a >> 28] | sp2[(a >> 20) & 0x3F] |
+                 sp4[(a >> 12) & 0x3F] | sp6[(a >> 4) & 0x3F] |
+                 sp1[(b >> 24) & 0x3F] | sp3[(b >> 16) & 0x3F] |
+                 sp5[(b >> 8) & 0x3F] | sp7[b & 0x3F])
+        if index % 16 != 0 or index == len(round_keys):
+            left, right = right, left
+    
+    # 交换左右后逆初始置换
+    block = (right << 32) | left
+    result = np.zeros_like(blocks)
+    for shift, lookup in zip(FP_PERMUTATION.shifts, fp_tables):
+        result |= lookup[(block >> shift) & 0xFF]
+    return result
 
 
 def test_des():
@@ -366,8 +1026,211 @@ def test_des():
     else:
         print("✗ 加密解密失败！")
     
+    # 流式加解密：分段送入，结果应与一次性加解密一致
+    print("\n流式加解密:")
+    data = plaintext.encode('utf-8')
+    encryptor = DESEncryptor(key)
+    stream_cipher = b''.join(encryptor.update(data[i:i + 3]) for i in range(0, len(data), 3))
+    stream_cipher += encryptor.finalize()
+    decryptor = DESDecryptor(key)
+    stream_plain = b''.join(decryptor.update(stream_cipher[i:i + 5]) for i in range(0, len(stream_cipher), 5))
+    stream_plain += decryptor.finalize()
+    if stream_cipher.hex().upper() == ciphertext and stream_plain == data:
+        print("✓ 流式结果与一次性加解密一致")
+    else:
+        print("✗ 流式结果与一次性加解密不一致！")
+    
+    # 二进制数据（非UTF-8）加解密
+    print("\n二进制数据加解密:")
+    binary = bytes(range(256))
+    if des.decrypt_bytes(des.encrypt_bytes(bytearray(binary))) == binary:
+        print("✓ 二进制数据往返一致")
+    else:
+        print("✗ 二进制数据往返不一致！")
+    # 多字节元素的缓冲区（如 array('I')）按字节处理
+    words = memoryview(binary).cast('I')
+    encryptor = DESEncryptor(key)
+    word_cipher = encryptor.update(words) + encryptor.finalize()
+    decryptor = DESDecryptor(key)
+    word_plain = decryptor.update(memoryview(word_cipher).cast('I')) + decryptor.finalize()
+    if word_cipher == des.encrypt_bytes(binary) and word_plain == binary:
+        print("✓ 流式加解密按字节处理多字节元素的缓冲区")
+    else:
+        print("✗ 流式加解密处理多字节元素的缓冲区出错！")
+    
+    # FIPS 46 已知答案：子密钥检查PC-1/PC-2与移位表，单分组检查整个加密流程
+    print("\nFIPS 46 已知答案测试:")
+    sub_keys = DES._generate_sub_keys(bytes.fromhex("133457799BBCDFF1"))
+    if sub_keys[0] == 0x1B02EFFC7072 and sub_keys[15] == 0xCB3D8B0E17F5:
+        print("✓ 子密钥K1、K16与标准一致")
+    else:
+        print(f"✗ 子密钥与标准不一致！K1={sub_keys[0]:012X} K16={sub_keys[15]:012X}")
+    block = DES(bytes.fromhex("133457799BBCDFF1")).encrypt(bytes.fromhex("0123456789ABCDEF"))[:16]
+    if block == "85E813540F0AB405":
+        print("✓ 单分组密文与标准一致")
+    else:
+        print(f"✗ 单分组密文与标准不一致！{block}")
+    
+    print("\n" + "=" * 60)
+
+
+def test_des_modes():
+    """DES工作模式已知答案测试（FIPS 81 示例向量）"""
+    print("=" * 60)
+    print("DES 工作模式已知答案测试")
+    print("=" * 60)
+    
+    key = bytes.fromhex("0123456789ABCDEF")
+    iv = bytes.fromhex("1234567890ABCDEF")
+    plaintext = b"Now is the time for all "
+    
+    # ECB/CBC密文取前3个分组（第4个分组为PKCS#7填充）
+    # CTR的第i个分组为明文与 E(IV + i) 异或
+    cases = [
+        ("单分组", DES(bytes.fromhex("133457799BBCDFF1")), bytes.fromhex("0123456789ABCDEF"),
+         "85E813540F0AB405"),
+        ("ECB", DES(key), plaintext,
+         "3FA40E8A984D48156A271787AB8883F9893D51EC4B563B53"),
+        ("CBC", DES(key, MODE_CBC, iv), plaintext,
+         "E5C7CDDE872BF27C43E934008C389C0F683788499A7C05F6"),
+        ("CTR", DES(key, MODE_CTR, iv), plaintext,
+         "F3096249C7F46E51163A8CA0FFC94C27FA2F80F480B86F75"),
+    ]
+    
+    for name, des, message, expected in cases:
+        full_ciphertext = des.encrypt(message)
+        ciphertext = full_ciphertext[:len(expected)]
+        decryptor = DESDecryptor(des)
+        decrypted = decryptor.update(bytes.fromhex(full_ciphertext)) + decryptor.finalize()
+        print(f"\n{name}: {ciphertext}")
+        print(f"预期: {expected}")
+        print(f"验证: {'✓ 通过' if ciphertext == expected and decrypted == message else '✗ 失败'}")
+    
+    # CTR密钥流分段生成应与一次生成一致
+    ctr = DES(key, MODE_CTR, iv)
+    stream = ctr.keystream(0, 16)
+    segmented = ctr.keystream(0, 5) + ctr.keystream(5, 11)
+    print(f"\nCTR分段密钥流: {'✓ 一致' if stream == segmented else '✗ 不一致'}")
+    
+    # NumPy向量化实现应与纯Python实现逐位一致
+    if np is not None:
+        data = bytes(range(256)) * 4
+        same = all(
+            DES(key, mode, mode_iv, BACKEND_NUMPY).encrypt(data) ==
+            DES(key, mode, mode_iv, BACKEND_PYTHON).encrypt(data)
+            for mode, mode_iv in ((MODE_ECB, None), (MODE_CBC, iv), (MODE_CTR, iv))
+        )
+        print(f"NumPy实现与纯Python实现: {'✓ 一致' if same else '✗ 不一致'}")
+    else:
+        print("NumPy实现: 未安装NumPy，已跳过")
+    
+    print("\n" + "=" * 60)
+
+
+def test_triple_des():
+    """三重DES已知答案测试（NIST SP 800-67 示例、SP 800-20 向量与双密钥示例向量）"""
+    print("=" * 60)
+    print("三重DES 已知答案测试")
+    print("=" * 60)
+    
+    cases = [
+        # SP 800-67 示例：三个独立密钥
+        ("三密钥", "0123456789ABCDEF23456789ABCDEF01456789ABCDEF0123",
+         b"The qufck brown fox jump",
+         "A826FD8CE53B855FCCE21C8112256FE668D5C05DD9B6B900"),
+        # SP 800-20 可变明文测试：K1 = K2 = K3 = 0101010101010101
+        ("SP 800-20", "010101010101010101010101010101010101010101010101",
+         bytes.fromhex("8000000000000000"), "95F8A5E5DD31D900"),
+        # 双密钥（K3 = K1）：支付行业常用的示例向量
+        # （K1单独加密同一明文为经典的 C95744256A5ED31D）
+        ("双密钥", "0123456789ABCDEFFEDCBA9876543210",
+         bytes.fromhex("0123456789ABCDE7"), "7F1D0A77826B8AFF"),
+    ]
+    
+    for name, key_hex, message, expected in cases:
+        tdes = TripleDES(bytes.fromhex(key_hex))
+        ciphertext = tdes.encrypt(message)[:len(expected)]
+        decrypted = tdes.decrypt_bytes(tdes.encrypt_bytes(message))
+        print(f"\n{name}: {ciphertext}")
+        print(f"预期: {expected}")
+        print(f"验证: {'✓ 通过' if ciphertext == expected and decrypted == message else '✗ 失败'}")
+    
+    print("\n" + "=" * 60)
+
+
+def benchmark_triple_des(blocks=2048):
+    """
+    三重DES吞吐量测试：48轮合并实现与三次单DES串联对比
+    :param blocks: 参与测试的分组数
+    """
+    print("=" * 60)
+    print("三重DES 吞吐量测试")
+    print("=" * 60)
+    
+    key = bytes.fromhex("0123456789ABCDEF23456789ABCDEF01456789ABCDEF0123")
+    data = b"0123456789ABCDEF" * (blocks // 2)
+    
+    tdes = TripleDES(key, backend=BACKEND_PYTHON)
+    start = time.perf_counter()
+    fused = tdes.encrypt_bytes(data)
+    elapsed = time.perf_counter() - start
+    print(f"\n48轮合并: {blocks / elapsed:,.0f} 分组/秒")
+    
+    des1, des2, des3 = (DES(key[i:i + 8], backend=BACKEND_PYTHON) for i in (0, 8, 16))
+    start = time.perf_counter()
+    chained = des1._process_blocks(_pad(data), des1._round_keys)
+    chained = des2._process_blocks(chained, des2._reversed_round_keys)
+    chained = des3._process_blocks(chained, des3._round_keys)
+    elapsed_chained = time.perf_counter() - start
+    print(f"三次单DES串联: {blocks / elapsed_chained:,.0f} 分组/秒")
+    print(f"结果一致: {'✓' if fused == chained else '✗'}，加速比 {elapsed_chained / elapsed:.2f}")
+    
+    print("\n" + "=" * 60)
+
+
+def benchmark_des(blocks=4096):
+    """
+    DES吞吐量测试
+    :param blocks: 参与测试的分组数
+    """
+    print("=" * 60)
+    print("DES 吞吐量测试")
+    print("=" * 60)
+    
+    data = b"0123456789ABCDEF" * (blocks // 2)
+    backends = [BACKEND_PYTHON] + ([BACKEND_NUMPY] if np is not None else [])
+    
+    for backend in backends:
+        des = DES("DESKEY12", backend=backend)
+        
+        start = time.perf_counter()
+        ciphertext = des.encrypt(data)
+        elapsed = time.perf_counter() - start
+        print(f"\n[{backend}] 加密: {len(data) // 8 / elapsed:,.0f} 分组/秒")
+        
+        start = time.perf_counter()
+        des.decrypt(ciphertext)
+        elapsed = time.perf_counter() - start
+        print(f"[{backend}] 解密: {len(data) // 8 / elapsed:,.0f} 分组/秒")
+    
+    # 同一密钥反复创建DES对象（密钥编排缓存命中）
+    count = 2000
+    start = time.perf_counter()
+    for _ in range(count):
+        DES("DESKEY12")
+    elapsed = time.perf_counter() - start
+    print(f"\n创建DES对象: {count / elapsed:,.0f} 次/秒")
+    print(f"密钥编排缓存: {KEY_SCHEDULE_CACHE.cache_info()}")
+    
     print("\n" + "=" * 60)
 
 
 if __name__ == "__main__":
-    test_des()
+    # 默认只运行测试；速度测试耗时较长，用 --benchmark 参数单独运行
+    if sys.argv[1:] == ['--benchmark']:
+        benchmark_des()
+        benchmark_triple_des()
+    else:
+        test_des()
+        test_des_modes()
+        test_triple_des()
@@ -0,0 +1,286 @@
+"""
+可随机访问的DES加密容器
+明文按固定大小分块，整体用DES-CTR加密（第i块从第 i * chunk_size / 8 个计数器开始），
+文件头后是每块密文的SHA-1摘要索引。块大小固定，因此任意偏移所在的块、
+该块的摘要与密文位置都可以直接算出，读取一小段数据只需解密并校验它涉及的块
+
+文件格式（整数均为大端序）：
+    魔数 b'DESC' | 版本(1字节) | 保留(3字节) | 块大小(4字节) | 明文长度(8字节) | 计数器初值(8字节)
+    块摘要索引：每块20字节SHA-1摘要
+    各块密文（最后一块可以不满）
+
+摘要不带密钥，只用于发现损坏，不能防止有意篡改
+"""
+
+import io
+import os
+import stat
+import struct
+import sys
+import tempfile
+import time
+
+from des import DES, MODE_CTR
+from sha1 import SHA1
+
+MAGIC = b'DESC'
+VERSION = 1
+
+_HEADER = struct.Struct('>4sB3xIQ8s')
+_DIGEST_SIZE = 20
+
+
+def _chunk_digest(data):
+    """计算一块密文的SHA-1摘要（20字节）"""
+    return SHA1(data).digest()
+
+
+def create_container(src, dst, key, iv=None, chunk_size=16 << 10):
+    """
+    创建加密容器（参数顺序与 des_file.encrypt_file 一致）
+    :param src: 明文文件路径或字节串
+    :param dst: 容器文件路径
+    :param key: 8字节密钥
+    :param iv: 8字节计数器初值，默认随机生成
+    :param chunk_size: 块大小（8的正整数倍）
+    :return: 明文长度
+    """
+    if chunk_size <= 0 or chunk_size % 8 != 0:
+        raise ValueError("块大小必须为8的正整数倍")
+    if iv is None:
+        iv = os.urandom(8)
+    des = DES(key, MODE_CTR, iv)
+    
+    if isinstance(src, (str, os.PathLike)):
+        fin = open(src, 'rb')
+        length = os.fstat(fin.fileno()).st_size
+    else:
+        fin = io.BytesIO(src)
+        length = len(src)
+    count = -(-length // chunk_size)
+    
+    # 与 des_file 相同，先写入目标目录中的临时文件，成功后再替换目标文件：
+    # 输入与输出是同一文件时不会在读取前被截断，出错时也不会留下不完整的容器
+    with fin:
+        fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(dst) + '.',
+                                         suffix='.tmp', dir=os.path.dirname(os.path.abspath(dst)))
+        try:
+            with os.fdopen(fd, 'wb') as fout:
+                fout.write(_HEADER.pack(MAGIC, VERSION, chunk_size, length, des.iv))
+                # 先占位写入索引，逐块加密时回填摘要
+                index_offset = fout.tell()
+                fout.write(bytes(_DIGEST_SIZE * count))
+                
+                digests = bytearray()
+                buffer = bytearray(chunk_size)
+                for i in range(count):
+                    size = fin.readinto(buffer)
+                    with memoryview(buffer)[:size] as chunk:
+                        encrypted, _ = des._ctr_xor(chunk, i * (chunk_size // 8))
+                    fout.write(encrypted)
+                    digests += _chunk_digest(encrypted)
+                
+                fout.seek(index_offset)
+                fout.write(digests)
+            # mkstemp创建的文件权限为0600，目标文件已存在时沿用其原有权限
+            if os.path.exists(dst):
+                os.chmod(temp_path, stat.S_IMODE(os.stat(dst).st_mode))
+            os.replace(temp_path, dst)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    return length
+
+
+class EncryptedContainer:
+    """加密容器读取器，按偏移随机读取并校验涉及的块"""
+    
+    def __init__(self, path, key):
+        """
+        打开容器
+        :param path: 容器文件路径
+        :param key: 8字节密钥
+        """
+        self._file = open(path, 'rb')
+        try:
+            header = self._file.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise ValueError("文件过短，不是有效的加密容器")
+            magic, version, chunk_size, length, iv = _HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError("不是有效的加密容器")
+            if version != VERSION:
+                raise ValueError(f"不支持的容器版本: {version}")
+            if chunk_size <= 0 or chunk_size % 8 != 0:
+                raise ValueError("容器块大小无效")
+        except Exception:
+            self._file.close()
+            raise
+        
+        self.chunk_size = chunk_size
+        self.size = length
+        self.chunks = -(-length // chunk_size)
+        self._des = DES(key, MODE_CTR, iv)
+        self._index_offset = _HEADER.size
+        self._data_offset = _HEADER.size + _DIGEST_SIZE * self.chunks
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def __len__(self):
+        return self.size
+    
+    def close(self):
+        """关闭容器文件"""
+        self._file.close()
+    
+    def read_chunk(self, index):
+        """
+        读取、校验并解密一块
+        :param index: 块序号
+        :return: 该块明文
+        """
+        if not 0 <= index < self.chunks:
+            raise IndexError("块序号超出范围")
+        size = min(self.chunk_size, self.size - index * self.chunk_size)
+        
+        self._file.seek(self._index_offset + index * _DIGEST_SIZE)
+        digest = self._file.read(_DIGEST_SIZE)
+        self._file.seek(self._data_offset + index * self.chunk_size)
+        encrypted = self._file.read(size)
+        if len(encrypted) != size or _chunk_digest(encrypted) != digest:
+            raise ValueError(f"第{index}块校验失败，容器已损坏")
+        
+        return self._des._ctr_xor(encrypted, index * (self.chunk_size // 8))[0]
+    
+    def read(self, offset, length):
+        """
+        读取明文中 [offset, offset + length) 的数据，超出末尾的部分被截断
+        :param offset: 明文偏移
+        :param length: 读取长度
+        :return: 明文字节串
+        """
+        if offset < 0 or length < 0:
+            raise ValueError("偏移与长度不能为负数")
+        end = min(offset + length, self.size)
+        if offset >= end:
+            return b''
+        
+        first = offset // self.chunk_size
+        last = (end - 1) // self.chunk_size
+        data = b''.join(self.read_chunk(i) for i in range(first, last + 1))
+        start = offset - first * self.chunk_size
+        return data[start:start + end - offset]
+    
+    def verify(self):
+        """
+        校验全部块
+        :return: 损坏的块序号列表
+        """
+        broken = []
+        for i in range(self.chunks):
+            try:
+                self.read_chunk(i)
+            except ValueError:
+                broken.append(i)
+        return broken
+
+
+def test_container():
+    """测试加密容器"""
+    print("=" * 60)
+    print("DES 随机访问加密容器测试")
+    print("=" * 60)
+    
+    key = "DESKEY12"
+    data = os.urandom(50_001)
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "data.desc")
+        create_container(data, path, key, chunk_size=4096)
+        
+        with EncryptedContainer(path, key) as container:
+            print(f"\n块数: {container.chunks}，明文长度: {len(container)}")
+            cases = [(0, 10), (4090, 20), (12_345, 9_000), (49_990, 100), (0, 50_001), (60_000, 5)]
+            ok = all(container.read(offset, length) == data[offset:offset + length]
+                     for offset, length in cases)
+            print(f"随机读取: {'✓ 与原文一致' if ok else '✗ 与原文不一致'}")
+            print(f"完整校验: {'✓ 无损坏' if not container.verify() else '✗ 有损坏'}")
+        
+        # 篡改第3块中的一个字节
+        with open(path, 'r+b') as f:
+            f.seek(_HEADER.size + _DIGEST_SIZE * 13 + 3 * 4096 + 100)
+            byte = f.read(1)
+            f.seek(-1, os.SEEK_CUR)
+            f.write(bytes([byte[0] ^ 1]))
+        
+        with EncryptedContainer(path, key) as container:
+            try:
+                container.read(3 * 4096, 10)
+                print("篡改检测: ✗ 未发现")
+            except ValueError as exc:
+                print(f"篡改检测: ✓ {exc}")
+            print(f"其他块读取: {'✓ 正常' if container.read(0, 100) == data[:100] else '✗ 异常'}")
+            print(f"损坏块: {container.verify()}")
+        
+        # 与一次性CTR加密结果一致
+        iv = bytes(8)
+        create_container(data, path, key, iv, chunk_size=4096)
+        with open(path, 'rb') as f:
+            f.seek(_HEADER.size + _DIGEST_SIZE * 13)
+            body = f.read()
+        expected = DES(key, MODE_CTR, iv).encrypt_bytes(data)
+        print(f"与连续CTR加密一致: {'✓' if body == expected else '✗'}")
+        
+        # 输入与输出为同一文件：读取完成前原文件保持不变，之后被容器替换
+        same_path = os.path.join(workdir, "same.bin")
+        with open(same_path, 'wb') as f:
+            f.write(data)
+        create_container(same_path, same_path, key, chunk_size=4096)
+        with EncryptedContainer(same_path, key) as container:
+            in_place = container.read(0, len(data)) == data and not container.verify()
+        print(f"原地创建容器: {'✓ 与原文一致' if in_place else '✗ 与原文不一致'}")
+    
+    print("\n" + "=" * 60)
+
+
+def benchmark_container(size=1 << 20, chunk_size=16 << 10):
+    """
+    随机读取耗时测试：在文件开头与末尾读取少量数据，耗时应与位置无关
+    :param size: 明文字节数
+    :param chunk_size: 块大小
+    """
+    print("=" * 60)
+    print("DES 加密容器随机读取测试")
+    print("=" * 60)
+    
+    key = "DESKEY12"
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "data.desc")
+        start = time.perf_counter()
+        create_container(os.urandom(size), path, key, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+        print(f"\n创建 {size >> 20} MB 容器: {elapsed:.2f} 秒")
+        
+        with EncryptedContainer(path, key) as container:
+            for offset in (0, size // 2, size - 100):
+                start = time.perf_counter()
+                for _ in range(5):
+                    container.read(offset, 100)
+                elapsed = (time.perf_counter() - start) / 5
+                print(f"  偏移 {offset:>9,} 处读取100字节: {elapsed * 1000:.2f} ms")
+    
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    # 默认只运行测试；速度测试耗时较长，用 --benchmark 参数单独运行
+    if sys.argv[1:] == ['--benchmark']:
+        benchmark_container()
+    else:
+        test_container()
@@ -0,0 +1,226 @@
+"""
+DES 文件加解密
+用 mmap 映射输入文件，按分组对齐的大块依次送入流式加解密器，
+输出经缓冲写入目标文件，内存占用与文件大小无关
+"""
+
+import argparse
+import mmap
+import os
+import stat
+import sys
+import tempfile
+import time
+
+from des import (DES, MODE_CBC, MODE_CTR, MODE_ECB, DESDecryptor, DESEncryptor,
+                 TripleDES)
+
+
+def _make_cipher(key, mode, iv):
+    """
+    根据密钥长度选择DES或三重DES
+    :param key: 8字节（DES）或16/24字节（三重DES）密钥
+    :param mode: 工作模式
+    :param iv: 初始向量或计数器初值
+    :return: DES或TripleDES对象
+    """
+    key = key.encode('utf-8') if isinstance(key, str) else bytes(key)
+    if len(key) == 8:
+        return DES(key, mode, iv)
+    return TripleDES(key, mode, iv)
+
+
+def _transform_file(src, dst, stream, chunk_size, progress):
+    """
+    将输入文件按块送入流式加解密器并写出结果
+    :param src: 输入文件路径
+    :param dst: 输出文件路径
+    :param stream: DESEncryptor 或 DESDecryptor
+    :param chunk_size: 每块字节数（向下取整到8的倍数）
+    :param progress: 进度回调 progress(已处理字节数, 总字节数, 字节/秒)，可为None
+    :return: 写出的字节数
+    """
+    chunk_size = max(8, chunk_size - chunk_size % 8)
+    written = 0
+    start = time.perf_counter()
+    
+    # 先写入目标目录中的临时文件，成功后再替换目标文件：
+    # 输入与输出是同一文件时不会在读取前被截断，出错时也不会留下不完整的输出
+    fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(dst) + '.',
+                                     suffix='.tmp', dir=os.path.dirname(os.path.abspath(dst)))
+    try:
+        with open(src, 'rb') as fin, os.fdopen(fd, 'wb') as fout:
+            total = os.fstat(fin.fileno()).st_size
+            # 空文件无法映射，直接结束
+            if total > 0:
+                with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    with memoryview(mapped) as view:
+                        for offset in range(0, total, chunk_size):
+                            with view[offset:offset + chunk_size] as chunk:
+                                output = stream.update(chunk)
+                            fout.write(output)
+                            written += len(output)
+                            if progress is not None:
+                                done = min(offset + chunk_size, total)
+                                elapsed = time.perf_counter() - start
+                                progress(done, total, done / elapsed if elapsed > 0 else 0.0)
+            output = stream.finalize()
+            fout.write(output)
+            written += len(output)
+        # mkstemp创建的文件权限为0600，目标文件已存在时沿用其原有权限
+        if os.path.exists(dst):
+            os.chmod(temp_path, stat.S_IMODE(os.stat(dst).st_mode))
+        os.replace(temp_path, dst)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    
+    return written
+
+
+def encrypt_file(src, dst, key, mode=MODE_ECB, iv=None, chunk_size=4 << 20, progress=None):
+    """
+    加密文件
+    :param src: 明文文件路径
+    :param dst: 密文文件路径
+    :param key: 8字节（DES）或16/24字节（三重DES）密钥
+    :param mode: 工作模式
+    :param iv: 8字节初始向量或计数器初值（ECB不需要）
+    :param chunk_size: 每次处理的字节数
+    :param progress: 进度回调 progress(已处理字节数, 总字节数, 字节/秒)
+    :return: 密文字节数
+    """
+    return _transform_file(src, dst, DESEncryptor(_make_cipher(key, mode, iv)), chunk_size, progress)
+
+
+def decrypt_file(src, dst, key, mode=MODE_ECB, iv=None, chunk_size=4 << 20, progress=None):
+    """
+    解密文件
+    :param src: 密文文件路径
+    :param dst: 明文文件路径
+    :param key: 8字节（DES）或16/24字节（三重DES）密钥
+    :param mode: 工作模式
+    :param iv: 8字节初始向量或计数器初值（ECB不需要）
+    :param chunk_size: 每次处理的字节数
+    :param progress: 进度回调 progress(已处理字节数, 总字节数, 字节/秒)
+    :return: 明文字节数
+    """
+    return _transform_file(src, dst, DESDecryptor(_make_cipher(key, mode, iv)), chunk_size, progress)
+
+
+def _print_progress(done, total, speed):
+    """命令行进度显示"""
+    percent = done * 100 / total if total else 100.0
+    print(f"\r  {percent:6.2f}%  {done:,}/{total:,} 字节  {speed / (1 << 20):.2f} MB/s",
+          end='', file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="DES/三重DES 文件加解密")
+    parser.add_argument('action', choices=['encrypt', 'decrypt'], help="加密或解密")
+    parser.add_argument('input', help="输入文件")
+    parser.add_argument('output', help="输出文件")
+    key_group = parser.add_mutually_exclusive_group(required=True)
+    key_group.add_argument('-k', '--key', help="密钥字符串（UTF-8编码后为8/16/24字节）")
+    key_group.add_argument('--key-hex', help="十六进制密钥")
+    parser.add_argument('-m', '--mode', choices=[MODE_ECB, MODE_CBC, MODE_CTR], default=MODE_ECB,
+                        help="工作模式（默认ECB）")
+    parser.add_argument('--iv', help="十六进制初始向量/计数器初值（CBC、CTR需要）")
+    parser.add_argument('--chunk-size', type=int, default=4 << 20, help="每次处理的字节数")
+    parser.add_argument('-q', '--quiet', action='store_true', help="不显示进度")
+    args = parser.parse_args(argv)
+    
+    key = bytes.fromhex(args.key_hex) if args.key_hex else args.key
+    iv = bytes.fromhex(args.iv) if args.iv else None
+    action = encrypt_file if args.action == 'encrypt' else decrypt_file
+    progress = None if args.quiet else _print_progress
+    
+    start = time.perf_counter()
+    try:
+        written = action(args.input, args.output, key, args.mode, iv, args.chunk_size, progress)
+    except (OSError, ValueError) as exc:
+        print(f"\n错误: {exc}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"完成: 写出 {written:,} 字节，用时 {elapsed:.2f} 秒")
+    return 0
+
+
+def test_des_file():
+    """测试文件加解密"""
+    print("=" * 60)
+    print("DES 文件加解密测试")
+    print("=" * 60)
+    
+    data = os.urandom(100_003)
+    iv = bytes.fromhex("1234567890ABCDEF")
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        plain_path = os.path.join(workdir, "plain.bin")
+        cipher_path = os.path.join(workdir, "cipher.bin")
+        restored_path = os.path.join(workdir, "restored.bin")
+        with open(plain_path, 'wb') as f:
+            f.write(data)
+        
+        for key, mode, mode_iv in (("DESKEY12", MODE_ECB, None),
+                                   ("DESKEY12", MODE_CBC, iv),
+                                   ("0123456789ABCDEF01234567", MODE_CTR, iv)):
+            reports = []
+            encrypt_file(plain_path, cipher_path, key, mode, mode_iv, chunk_size=16 << 10,
+                         progress=lambda done, total, speed: reports.append(done))
+            decrypt_file(cipher_path, restored_path, key, mode, mode_iv, chunk_size=10_000)
+            
+            with open(cipher_path, 'rb') as f:
+                ciphertext = f.read()
+            with open(restored_path, 'rb') as f:
+                restored = f.read()
+            expected = _make_cipher(key, mode, mode_iv).encrypt_bytes(data)
+            
+            print(f"\n{len(key.encode('utf-8')) * 8}位密钥 {mode}模式:")
+            print(f"  密文与内存加密结果: {'✓ 一致' if ciphertext == expected else '✗ 不一致'}")
+            print(f"  解密文件: {'✓ 与原文件一致' if restored == data else '✗ 与原文件不一致'}")
+            print(f"  进度回调: {'✓' if reports and reports[-1] == len(data) else '✗'} 共 {len(reports)} 次")
+        
+        # 输入与输出为同一文件：原文件在加密完成前保持不变，之后被密文替换
+        same_path = os.path.join(workdir, "same.bin")
+        with open(same_path, 'wb') as f:
+            f.write(data)
+        encrypt_file(same_path, same_path, "DESKEY12", chunk_size=16 << 10)
+        decrypt_file(same_path, same_path, "DESKEY12")
+        with open(same_path, 'rb') as f:
+            in_place = f.read()
+        print(f"\n原地加解密: {'✓ 与原文件一致' if in_place == data else '✗ 与原文件不一致'}")
+        
+        # 覆盖已有文件时保留其权限
+        os.chmod(same_path, 0o640)
+        encrypt_file(same_path, same_path, "DESKEY12")
+        mode_kept = stat.S_IMODE(os.stat(same_path).st_mode) == 0o640
+        print(f"覆盖时保留权限: {'✓' if mode_kept else '✗'} {oct(stat.S_IMODE(os.stat(same_path).st_mode))}")
+        
+        # 出错时不留下输出文件或临时文件：密文长度按分组对齐，
+        # 但最后一个分组解密为全零，去填充时报错
+        broken_path = os.path.join(workdir, "broken.bin")
+        with open(broken_path, 'wb') as f:
+            f.write(DES("DESKEY12").encrypt_bytes(data)[:-8] + DES("DESKEY12").encrypt_bytes(bytes(8))[:8])
+        try:
+            decrypt_file(broken_path, os.path.join(workdir, "broken.out"), "DESKEY12")
+            print("出错清理: ✗ 未报错")
+        except ValueError as exc:
+            leftovers = sorted(set(os.listdir(workdir)) -
+                               {"plain.bin", "cipher.bin", "restored.bin", "same.bin", "broken.bin"})
+            print(f"出错清理: {'✓ 没有残留文件' if not leftovers else f'✗ 残留 {leftovers}'} （{exc}）")
+    
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main())
+    test_des_file()
@@ -0,0 +1,470 @@
+"""
+DES 部分已知密钥搜索
+已知一组明文/密文和密钥的大部分比特时，枚举未知比特恢复密钥（用于授权的CTF与审计场景）
+
+密钥编排中的PC-1、循环移位、PC-2都是比特置换，因此轮密钥对密钥是线性的：
+schedule(k1 ^ k2) = schedule(k1) ^ schedule(k2)。预先计算已知部分与每个未知比特对应的轮密钥，
+按格雷码顺序枚举候选密钥，相邻候选只差一个比特，轮密钥只需异或一次增量，不必为每个候选创建DES对象
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from des import DES, IP_PERMUTATION, SP_BOX, _split_sub_keys
+
+# 每字节最低位是奇偶校验位，不参与密钥编排
+PARITY_MASK = 0x0101010101010101
+
+# 工作进程检查停止标志的间隔（候选数）
+_STOP_CHECK_INTERVAL = 4096
+
+
+class KeySpace:
+    """由已知密钥与未知比特掩码确定的候选密钥空间"""
+    
+    def __init__(self, key, mask):
+        """
+        初始化密钥空间
+        :param key: 8字节已知密钥，未知比特处的取值任意
+        :param mask: 8字节或64位整数掩码，为1的比特未知；奇偶校验位不影响加密，会被忽略
+        """
+        key = key.encode('utf-8') if isinstance(key, str) else bytes(key)
+        if len(key) != 8:
+            raise ValueError("DES密钥必须为8字节")
+        if not isinstance(mask, int):
+            mask = bytes(mask)
+            if len(mask) != 8:
+                raise ValueError("掩码必须为8字节")
+            mask = int.from_bytes(mask, 'big')
+        if not 0 <= mask < 1 << 64:
+            raise ValueError("掩码必须为64位")
+        
+        self.mask = mask & ~PARITY_MASK & 0xFFFFFFFFFFFFFFFF
+        self.base = int.from_bytes(key, 'big') & ~self.mask
+        # 未知比特位置，低位在前
+        self.positions = tuple(i for i in range(64) if self.mask >> i & 1)
+        self.unknown_bits = len(self.positions)
+        self.size = 1 << self.unknown_bits
+    
+    def key_at(self, index):
+        """
+        将候选序号映射为密钥（序号按格雷码展开到未知比特上）
+        :param index: 候选序号，0 <= index < size
+        :return: 8字节密钥
+        """
+        gray = index ^ (index >> 1)
+        key = self.base
+        for j, position in enumerate(self.positions):
+            if gray >> j & 1:
+                key |= 1 << position
+        return key.to_bytes(8, 'big')
+
+
+def _flat_round_keys(key):
+    """
+    计算64位整数密钥的轮密钥并展开为32个整数 (key_a0, key_b0, key_a1, ...)
+    :param key: 64位整数密钥
+    :return: 轮密钥元组
+    """
+    round_keys = _split_sub_keys(DES._generate_sub_keys(key.to_bytes(8, 'big')))
+    return tuple(k for pair in round_keys for k in pair)
+
+
+# 已准备好的搜索上下文，工作进程处理同一搜索的多个分片时复用
+_CONTEXT_CACHE = {}
+
+
+def _prepare(key, mask, plaintext, ciphertext):
+    """
+    预计算搜索所需的轮密钥增量与明文、密文的初始置换结果
+    :return: (keyspace, base_round_keys, deltas, left, right, target_left, target_right)
+    """
+    cache_key = (key, mask, plaintext, ciphertext)
+    context = _CONTEXT_CACHE.get(cache_key)
+    if context is None:
+        keyspace = KeySpace(key, mask)
+        base_round_keys = _flat_round_keys(keyspace.base)
+        # 每个未知比特单独置1时的轮密钥即为翻转该比特时的增量
+        deltas = tuple(_flat_round_keys(1 << position) for position in keyspace.positions)
+        
+        block = IP_PERMUTATION(int.from_bytes(plaintext, 'big'))
+        # 密文经过IP即得到第16轮后交换前的 (right << 32) | left
+        target = IP_PERMUTATION(int.from_bytes(ciphertext, 'big'))
+        context = (keyspace, base_round_keys, deltas,
+                   block >> 32, block & 0xFFFFFFFF,
+                   target & 0xFFFFFFFF, target >> 32)
+        _CONTEXT_CACHE.clear()
+        _CONTEXT_CACHE[cache_key] = context
+    return context
+
+
+def search_range(key, mask, plaintext, ciphertext, start, end, stop_event=None):
+    """
+    在候选序号 [start, end) 中搜索与明文/密文对匹配的密钥
+    :param key: 8字节已知密钥
+    :param mask: 未知比特掩码
+    :param plaintext: 8字节已知明文
+    :param ciphertext: 8字节对应密文
+    :param start: 起始候选序号
+    :param end: 结束候选序号
+    :param stop_event: 可选的停止标志，置位后尽快返回
+    :return: (找到的8字节密钥或None, 实际测试的候选数)
+    """
+    keyspace, base_round_keys, deltas, left0, right0, target_left, target_right = \
+        _prepare(bytes(key), mask, bytes(plaintext), bytes(ciphertext))
+    sp0, sp1, sp2, sp3, sp4, sp5, sp6, sp7 = SP_BOX
+    
+    # 起始候选的轮密钥：已知部分异或各个置1的未知比特的增量
+    gray = start ^ (start >> 1)
+    round_keys = list(base_round_keys)
+    for j, delta in enumerate(deltas):
+        if gray >> j & 1:
+            round_keys = [x ^ y for x, y in zip(round_keys, delta)]
+    
+    for chunk_start in range(start, end, _STOP_CHECK_INTERVAL):
+        if stop_event is not None and stop_event.is_set():
+            return None, chunk_start - start
+        
+        for index in range(chunk_start, min(chunk_start + _STOP_CHECK_INTERVAL, end)):
+            if index != start:
+                # 格雷码相邻两项只在 index 最低的1所在比特上不同
+                delta = deltas[(index & -index).bit_length() - 1]
+                round_keys = [x ^ y for x, y in zip(round_keys, delta)]
+            
+            left = left0
+            right = right0
+            keys = iter(round_keys)
+            for key_a, key_b, key_c, key_d in zip(keys, keys, keys, keys):
+                t = ((right & 1) << 33) | (right << 1) | (right >> 31)
+                a = t ^ key_a
+                b = t ^ key_b
+                left ^= (sp0[a >> 28] | sp2[(a >> 20) & 0x3F] |
+                         sp4[(a >> 12) & 0x3F] | sp6[(a >> 4) & 0x3F] |
+                         sp1[(b >> 24) & 0x3F] | sp3[(b >> 16) & 0x3F] |
+                         sp5[(b >> 8) & 0x3F] | sp7[b & 0x3F])
+                t = ((left & 1) << 33) | (left << 1) | (left >> 31)
+                a = t ^ key_c
+                b = t ^ key_d
+                right ^= (sp0[a >> 28] | sp2[(a >> 20) & 0x3F] |
+                          sp4[(a >> 12) & 0x3F] | sp6[(a >> 4) & 0x3F] |
+                          sp1[(b >> 24) & 0x3F] | sp3[(b >> 16) & 0x3F] |
+                          sp5[(b >> 8) & 0x3F] | sp7[b & 0x3F])
+            
+            if left == target_left and right == target_right:
+                return keyspace.key_at(index), index - start + 1
+    
+    return None, end - start
+
+
+# 工作进程中的停止标志，由进程池初始化函数设置
+_STOP_EVENT = None
+
+
+def _init_worker(stop_event):
+    """工作进程初始化：保存共享的停止标志"""
+    global _STOP_EVENT
+    _STOP_EVENT = stop_event
+
+
+def _search_slice(key, mask, plaintext, ciphertext, start, end):
+    """工作进程：搜索一个分片"""
+    return search_range(key, mask, plaintext, ciphertext, start, end, _STOP_EVENT)
+
+
+class DESKeySearch:
+    """多进程DES部分已知密钥搜索，支持进度回调与检查点续搜"""
+    
+    def __init__(self, plaintext, ciphertext, key, mask, workers=None, slice_size=1 << 16,
+                 checkpoint=None, checkpoint_interval=10.0):
+        """
+        初始化搜索任务
+        :param plaintext: 8字节已知明文
+        :param ciphertext: 8字节对应密文
+        :param key: 8字节已知密钥，未知比特处的取值任意
+        :param mask: 8字节或64位整数掩码，为1的比特未知
+        :param workers: 工作进程数，默认为CPU核数
+        :param slice_size: 每个任务搜索的候选数
+        :param checkpoint: 检查点文件路径，为None时不保存进度
+        :param checkpoint_interval: 两次保存检查点的最短间隔（秒）
+        """
+        self.plaintext = plaintext.encode('utf-8') if isinstance(plaintext, str) else bytes(plaintext)
+        self.ciphertext = bytes(ciphertext)
+        if len(self.plaintext) != 8 or len(self.ciphertext) != 8:
+            raise ValueError("明文与密文都必须为8字节")
+        if slice_size < 1:
+            raise ValueError("分片大小必须为正数")
+        
+        self.keyspace = KeySpace(key, mask)
+        self.key = self.keyspace.base.to_bytes(8, 'big')
+        self.mask = self.keyspace.mask
+        self.workers = workers or os.cpu_count() or 1
+        self.slice_size = slice_size
+        self.slices = -(-self.keyspace.size // slice_size)
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        
+        # 所有序号小于 _next_slice 的分片以及 _done 中的分片已经搜索完毕
+        self._next_slice = 0
+        self._done = set()
+        self.found = None
+        self.tested = 0
+        if checkpoint is not None and os.path.exists(checkpoint):
+            self._load_checkpoint()
+    
+    def _parameters(self):
+        """检查点中用于核对搜索任务的参数"""
+        return {
+            'key': self.key.hex(),
+            'mask': f"{self.mask:016x}",
+            'plaintext': self.plaintext.hex(),
+            'ciphertext': self.ciphertext.hex(),
+            'slice_size': self.slice_size,
+        }
+    
+    def _load_checkpoint(self):
+        """从检查点文件恢复进度"""
+        with open(self.checkpoint, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('parameters') != self._parameters():
+            raise ValueError("检查点与当前搜索参数不一致")
+        self._next_slice = state['next_slice']
+        self._done = set(state['done'])
+        self.tested = state['tested']
+        self.found = bytes.fromhex(state['found']) if state['found'] else None
+    
+    def _save_checkpoint(self):
+        """写入检查点文件（先写临时文件再替换，避免中断时留下损坏的文件）"""
+        if self.checkpoint is None:
+            return
+        state = {
+            'parameters': self._parameters(),
+            'next_slice': self._next_slice,
+            'done': sorted(self._done),
+            'tested': self.tested,
+            'found': self.found.hex() if self.found else None,
+        }
+        temp_path = self.checkpoint + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.checkpoint)
+    
+    def _mark_done(self, index):
+        """记录分片完成，并推进连续完成的水位"""
+        self._done.add(index)
+        while self._next_slice in self._done:
+            self._done.remove(self._next_slice)
+            self._next_slice += 1
+    
+    def _pending_slices(self):
+        """按顺序生成尚未搜索的分片序号"""
+        for index in range(self._next_slice, self.slices):
+            if index not in self._done:
+                yield index
+    
+    def _slice_args(self, index):
+        """分片对应的 _search_slice 参数"""
+        start = index * self.slice_size
+        end = min(start + self.slice_size, self.keyspace.size)
+        return (self.key, self.mask, self.plaintext, self.ciphertext, start, end)
+    
+    def run(self, progress=None):
+        """
+        执行搜索，找到密钥后立即停止
+        :param progress: 进度回调 progress(已测试候选数, 候选总数, 密钥/秒)
+        :return: 8字节密钥，未找到返回None
+        """
+        if self.found is not None:
+            return self.found
+        
+        start_time = time.perf_counter()
+        start_tested = self.tested
+        last_save = start_time
+        
+        def report(index, result):
+            nonlocal last_save
+            key, tested = result
+            self.tested += tested
+            if key is not None:
+                self.found = key
+            else:
+                self._mark_done(index)
+            now = time.perf_counter()
+            if progress is not None:
+                elapsed = now - start_time
+                speed = (self.tested - start_tested) / elapsed if elapsed > 0 else 0.0
+                progress(self.tested, self.keyspace.size, speed)
+            if now - last_save >= self.checkpoint_interval:
+                self._save_checkpoint()
+                last_save = now
+        
+        try:
+            if self.workers == 1:
+                for index in self._pending_slices():
+                    report(index, search_range(*self._slice_args(index)))
+                    if self.found is not None:
+                        break
+            else:
+                self._run_pool(report)
+        finally:
+            self._save_checkpoint()
+        return self.found
+    
+    def _run_pool(self, report):
+        """
+        用进程池搜索，同时在途的任务数保持为进程数的两倍
+        :param report: 每个分片完成时的回调 report(分片序号, (密钥, 测试数))
+        """
+        stop_event = multiprocessing.Event()
+        pending = self._pending_slices()
+        running = {}
+        executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                       initargs=(stop_event,))
+        try:
+            while True:
+                while self.found is None and len(running) < self.workers * 2:
+                    index = next(pending, None)
+                    if index is None:
+                        break
+                    running[executor.submit(_search_slice, *self._slice_args(index))] = index
+                if not running:
+                    break
+                
+                completed, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    report(running.pop(future), future.result())
+                if self.found is not None:
+                    # 通知其他进程尽快结束当前分片
+                    stop_event.set()
+        finally:
+            stop_event.set()
+            executor.shutdown(cancel_futures=True)
+
+
+def search_key(plaintext, ciphertext, key, mask, workers=None, progress=None, checkpoint=None):
+    """
+    搜索部分已知的DES密钥
+    :param plaintext: 8字节已知明文
+    :param ciphertext: 8字节对应密文
+    :param key: 8字节已知密钥，未知比特处的取值任意
+    :param mask: 8字节或64位整数掩码，为1的比特未知
+    :param workers: 工作进程数，默认为CPU核数
+    :param progress: 进度回调 progress(已测试候选数, 候选总数, 密钥/秒)
+    :param checkpoint: 检查点文件路径
+    :return: 8字节密钥，未找到返回None
+    """
+    return DESKeySearch(plaintext, ciphertext, key, mask, workers=workers,
+                        checkpoint=checkpoint).run(progress)
+
+
+def test_key_search():
+    """测试密钥搜索"""
+    import tempfile
+    
+    print("=" * 60)
+    print("DES 部分已知密钥搜索测试")
+    print("=" * 60)
+    
+    secret = bytes.fromhex("133457799BBCDFF1")
+    plaintext = bytes.fromhex("0123456789ABCDEF")
+    ciphertext = bytes.fromhex("85E813540F0AB405")
+    des = DES(secret)
+    print(f"\n密文核对: {'✓' if des._process_block(int.from_bytes(plaintext, 'big'), des._round_keys) == int.from_bytes(ciphertext, 'big') else '✗'}")
+    
+    # 未知最后两个字节的有效比特（14位），已知部分随意填0
+    mask = 0xFFFF
+    guess = secret[:6] + b'\x00\x00'
+    keyspace = KeySpace(guess, mask)
+    print(f"未知比特数: {keyspace.unknown_bits}（奇偶校验位已忽略）")
+    
+    found = DESKeySearch(plaintext, ciphertext, guess, mask, workers=1, slice_size=1024).run()
+    matched = found is not None and DES(found)._round_keys == des._round_keys
+    print(f"单进程搜索: {found.hex().upper() if found else None} {'✓' if matched else '✗'}")
+    
+    found = search_key(plaintext, ciphertext, guess, mask, workers=2)
+    matched = found is not None and DES(found)._round_keys == des._round_keys
+    print(f"多进程搜索: {found.hex().upper() if found else None} {'✓' if matched else '✗'}")
+    
+    # 密钥不在搜索空间内时遍历全部候选后返回None
+    wrong = bytes.fromhex("0000000000000000")
+    missing = DESKeySearch(plaintext, ciphertext, wrong, 0xFF, workers=1).run()
+    print(f"空间外密钥: {'✓ 未找到' if missing is None else '✗ 误报'}")
+    
+    # 中断后从检查点续搜
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "search.json")
+        search = DESKeySearch(plaintext, ciphertext, guess, mask, workers=1, slice_size=512,
+                              checkpoint=path)
+        
+        def interrupt(tested, total, speed):
+            if tested >= 2048:
+                raise KeyboardInterrupt
+        
+        try:
+            search.run(interrupt)
+        except KeyboardInterrupt:
+            pass
+        resumed = DESKeySearch(plaintext, ciphertext, guess, mask, workers=1, slice_size=512,
+                               checkpoint=path)
+        skipped = resumed._next_slice
+        found = resumed.run()
+        matched = found is not None and DES(found)._round_keys == des._round_keys
+        print(f"检查点续搜: 跳过 {skipped} 个分片，结果 {'✓' if matched else '✗'}")
+    
+    print("\n" + "=" * 60)
+
+
+def benchmark_key_search(bits=14):
+    """
+    密钥搜索速度测试
+    :param bits: 搜索的未知比特数（目标密钥不在空间内，遍历全部候选）
+    """
+    print("=" * 60)
+    print("DES 密钥搜索速度测试")
+    print("=" * 60)
+    
+    plaintext = bytes.fromhex("0123456789ABCDEF")
+    ciphertext = bytes.fromhex("0000000000000000")
+    key = bytes(8)
+    # 取最后若干字节中的非校验位
+    mask = 0
+    positions = [i for i in range(64) if i % 8 != 0][:bits]
+    for position in positions:
+        mask |= 1 << position
+    total = 1 << bits
+    
+    # 对照：每个候选创建一个DES对象
+    count = 2000
+    keyspace = KeySpace(key, mask)
+    start = time.perf_counter()
+    for index in range(count):
+        candidate = DES(keyspace.key_at(index))
+        candidate._process_block(0x0123456789ABCDEF, candidate._round_keys)
+    elapsed = time.perf_counter() - start
+    print(f"\n逐个创建DES对象: {count / elapsed:,.0f} 密钥/秒")
+    
+    start = time.perf_counter()
+    search_range(key, mask, plaintext, ciphertext, 0, total)
+    elapsed = time.perf_counter() - start
+    single = total / elapsed
+    print(f"格雷码增量轮密钥（单核）: {single:,.0f} 密钥/秒")
+    
+    cores = os.cpu_count() or 1
+    search = DESKeySearch(plaintext, ciphertext, key, mask, workers=cores, slice_size=total // (cores * 4) or 1)
+    start = time.perf_counter()
+    search.run()
+    elapsed = time.perf_counter() - start
+    print(f"{cores} 个进程: {total / elapsed:,.0f} 密钥/秒，每核 {total / elapsed / cores:,.0f} 密钥/秒")
+    
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    # 默认只运行测试；速度测试耗时较长，用 --benchmark 参数单独运行
+    if sys.argv[1:] == ['--benchmark']:
+        benchmark_key_search()
+    else:
+        test_key_search()
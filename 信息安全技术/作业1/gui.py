@@ -2,7 +2,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 
 from des import DES
-from rsa import RSA
+from rsa_keypool import RSAKeyPool
 from sha1 import SHA1
 
 
@@ -15,6 +15,9 @@ class CryptoGUI:
         master.geometry("900x700")
 
         self.rsa_instance = None
+        # 后台预生成RSA密钥对，生成/演示时直接从池中取用
+        self.key_pool = RSAKeyPool(key_sizes=(256,), size=2)
+        master.protocol("WM_DELETE_WINDOW", self._on_close)
 
         notebook = ttk.Notebook(master)
         notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -89,6 +92,10 @@ class CryptoGUI:
         except Exception as exc:
             messagebox.showerror("DES 错误", f"解密失败: {exc}")
 
+    def _on_close(self):
+        self.key_pool.close()
+        self.master.destroy()
+
     # ----------------------- RSA -----------------------
     def _build_rsa_tab(self):
         ttk.Label(self.rsa_frame, text="密钥长度 (位):").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
@@ -127,8 +134,8 @@ class CryptoGUI:
             key_size = int(self.rsa_keysize_entry.get())
             if key_size < 128:
                 raise ValueError("密钥长度应不小于128位")
-            self.rsa_instance = RSA(key_size=key_size)
-            public_key, private_key = self.rsa_instance.generate_keys()
+            self.rsa_instance = self.key_pool.take_rsa(key_size)
+            public_key, private_key = self.rsa_instance.public_key, self.rsa_instance.private_key
             self.rsa_keys_text.delete("1.0", tk.END)
             self.rsa_keys_text.insert(
                 tk.END,
@@ -249,8 +256,7 @@ class CryptoGUI:
             log_lines.append("[3] DES 加密结果 (十六进制): " + ciphertext)
 
             # RSA 加密 DES 密钥
-            rsa = RSA(key_size=rsa_bits)
-            rsa.generate_keys()
+            rsa = self.key_pool.take_rsa(rsa_bits)
             encrypted_key = rsa.encrypt(des_key)
             log_lines.append("[4] RSA 加密的 DES 密钥: " + ",".join(str(x) for x in encrypted_key))
 
@@ -4,7 +4,8 @@
 """
 
 from des import DES, test_des
-from rsa import RSA, test_rsa
+from rsa import test_rsa
+from rsa_keypool import RSAKeyPool
 from sha1 import SHA1, test_sha1
 
 
@@ -24,6 +25,9 @@ def main():
     print("  3. SHA-1 (Secure Hash Algorithm 1) 哈希算法")
     print("\n说明：所有算法均为手动实现，未使用第三方加密库\n")
     
+    # 后台预生成综合测试要用的RSA密钥对
+    key_pool = RSAKeyPool(key_sizes=(256,), size=1)
+    
     input("按Enter键开始测试DES算法...")
     
     # 测试1：DES算法
@@ -69,8 +73,7 @@ def main():
     
     # 4. 使用RSA加密DES密钥
     print("\n4. 使用RSA加密DES密钥...")
-    rsa = RSA(key_size=256)
-    rsa.generate_keys()
+    rsa = key_pool.take_rsa(256)
     encrypted_key = rsa.encrypt(des_key)
     print(f"   加密的密钥: {encrypted_key}")
     
@@ -99,6 +102,9 @@ def main():
     else:
         print("\n   ✗ 综合测试失败！")
     
+    # 保存补充后的密钥池，下次运行可直接取用
+    key_pool.close()
+    
     print("\n" + "=" * 80)
     print("实验完成！".center(80))
     print("=" * 80 + "\n")
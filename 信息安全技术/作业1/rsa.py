@@ -3,35 +3,298 @@ RSA (Rivest-Shamir-Adleman) 算法手动实现
 不使用任何第三方加密库，从底层实现RSA算法
 """
 
+import math
+import multiprocessing
+import os
+import pickle
 import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import compress, islice
+
+from sha1 import SHA1
+
+
+class RSAPublicKey(tuple):
+    """
+    RSA公钥
+    可以像原来的 (e, n) 二元组一样下标访问和解包；
+    调用 precompute() 后逐字节加密改为查全部256个字节值的密文表，表随公钥对象一起释放；
+    不调用时逐个做幂运算，只加密一次的密钥不必为建表付出256次幂运算
+    """
+    
+    def __new__(cls, e, n):
+        """
+        创建公钥
+        :param e: 公钥指数
+        :param n: 模数
+        """
+        key = super().__new__(cls, (e, n))
+        key._byte_table = None
+        return key
+    
+    def __getnewargs__(self):
+        return (self[0], self[1])
+    
+    def __getstate__(self):
+        # 密文表可随时重建，序列化时不保存
+        return None
+    
+    @property
+    def e(self):
+        """公钥指数"""
+        return self[0]
+    
+    @property
+    def n(self):
+        """模数"""
+        return self[1]
+    
+    @property
+    def has_byte_table(self):
+        """是否已经计算了密文表"""
+        return self._byte_table is not None
+    
+    def precompute(self):
+        """
+        计算逐字节加密的密文表，之后 RSA.encrypt 直接查表
+        :return: 公钥本身
+        """
+        self.byte_table()
+        return self
+    
+    def byte_table(self):
+        """
+        逐字节加密的密文表，第b项为 b^e mod n（尚未计算时立即计算）
+        :return: 256项元组
+        """
+        if self._byte_table is None:
+            e, n = self
+            self._byte_table = tuple(pow(b, e, n) for b in range(256))
+        return self._byte_table
+    
+    def clear_byte_cache(self):
+        """释放密文表"""
+        self._byte_table = None
+
+
+class RSAPrivateKey(tuple):
+    """
+    RSA私钥
+    可以像原来的 (d, n) 二元组一样下标访问和解包，同时保存中国剩余定理(CRT)参数
+    p、q、dP = d mod (p-1)、dQ = d mod (q-1)、qInv = q^-1 mod p，用于加速私钥运算；
+    多素数RSA（PKCS#1 v2.1）的其余素因子r_i保存在 other_primes 中，
+    每项为 (r_i, d mod (r_i-1), (r_1*...*r_(i-1))^-1 mod r_i)
+    """
+    
+    def __new__(cls, d, n, p=None, q=None, *other_primes):
+        """
+        创建私钥
+        :param d: 私钥指数
+        :param n: 模数
+        :param p: 素因子p，为None时只能使用 (d, n) 直接运算
+        :param q: 素因子q
+        :param other_primes: 多素数RSA的其余素因子
+        """
+        key = super().__new__(cls, (d, n))
+        if p is not None and q is not None:
+            primes = (p, q) + other_primes
+            if math.prod(primes) != n:
+                raise ValueError("素因子的乘积与模数n不一致")
+            key.p = p
+            key.q = q
+            key.dP = d % (p - 1)
+            key.dQ = d % (q - 1)
+            key.qInv = pow(q, -1, p)
+            key.primes = primes
+            key.other_primes = []
+            product = p * q
+            for r in other_primes:
+                key.other_primes.append((r, d % (r - 1), pow(product, -1, r)))
+                product *= r
+            key.other_primes = tuple(key.other_primes)
+        elif other_primes:
+            raise ValueError("缺少素因子p、q")
+        else:
+            key.p = key.q = key.dP = key.dQ = key.qInv = None
+            key.primes = key.other_primes = ()
+        key._byte_lookup = None
+        key._byte_lookup_complete = False
+        return key
+    
+    def __getnewargs__(self):
+        # 序列化（如传给工作进程）时连同CRT参数一起保存
+        return (self[0], self[1], self.p, self.q) + self.primes[2:]
+    
+    def __getstate__(self):
+        # 其余属性都由 __new__ 重新计算，反查表不保存
+        return None
+    
+    @property
+    def d(self):
+        """私钥指数"""
+        return self[0]
+    
+    @property
+    def n(self):
+        """模数"""
+        return self[1]
+    
+    @property
+    def has_crt(self):
+        """是否保存了CRT参数"""
+        return self.p is not None
+    
+    def precompute(self):
+        """
+        计算逐字节解密的完整反查表，之后 RSA.decrypt 对全部字节值的密文直接查表
+        :return: 私钥本身
+        """
+        self.byte_lookup()
+        return self
+    
+    def byte_cache(self):
+        """
+        解密时使用的反查表：未调用 precompute() 时只包含此前解密过的密文，不做额外运算
+        :return: 字典
+        """
+        if self._byte_lookup is None:
+            self._byte_lookup = {}
+        return self._byte_lookup
+    
+    def byte_lookup(self):
+        """
+        逐字节解密的完整反查表 {密文: 字节值}（尚未计算时立即计算）
+        有素因子时由 e = d^-1 mod λ(n) 一次算出全部256项（与原公钥指数模λ(n)同余，密文相同），
+        否则只有解密时逐步填充的项
+        :return: 字典
+        """
+        if not self._byte_lookup_complete:
+            lookup = self.byte_cache()
+            if self.has_crt:
+                carmichael = math.lcm(*(prime - 1 for prime in self.primes))
+                try:
+                    e = pow(self.d, -1, carmichael)
+                except ValueError:
+                    e = None
+                if e is not None:
+                    n = self.n
+                    lookup.update((pow(b, e, n), b) for b in range(256))
+            self._byte_lookup_complete = True
+        return self._byte_lookup
+    
+    def clear_byte_cache(self):
+        """释放反查表"""
+        self._byte_lookup = None
+        self._byte_lookup_complete = False
+
+
+def _private_pow(value, private_key):
+    """
+    私钥运算 value^d mod n
+    私钥带有CRT参数时分别在模各素因子下做较短的幂运算再用Garner公式逐个合并，
+    否则退回对 (d, n) 直接做幂运算
+    :param value: 整数
+    :param private_key: RSAPrivateKey 或 (d, n) 二元组
+    :return: value^d mod n
+    """
+    if isinstance(private_key, RSAPrivateKey) and private_key.has_crt:
+        p = private_key.p
+        q = private_key.q
+        m1 = pow(value, private_key.dP, p)
+        m2 = pow(value, private_key.dQ, q)
+        h = private_key.qInv * (m1 - m2) % p
+        result = m2 + h * q
+        # 多素数RSA：依次并入模r_i的结果
+        product = p * q
+        for r, exponent, coefficient in private_key.other_primes:
+            m = pow(value, exponent, r)
+            result += product * ((m - result) * coefficient % r)
+            product *= r
+        return result
+    d, n = private_key
+    return pow(value, d, n)
+
+
+# PKCS#1 v1.5 加密填充的最小开销：0x00 0x02 + 至少8字节非零随机数 + 0x00
+_PKCS1_OVERHEAD = 11
+
+
+def _pkcs1_pad(block, k):
+    """
+    PKCS#1 v1.5 加密填充：0x00 || 0x02 || 非零随机字节 || 0x00 || block
+    :param block: 明文块，长度不超过 k - 11
+    :param k: 模数字节数
+    :return: k字节的填充结果
+    """
+    ps_len = k - len(block) - 3
+    ps = b''
+    while len(ps) < ps_len:
+        ps += os.urandom(ps_len - len(ps) + 8).replace(b'\x00', b'')
+    return b'\x00\x02' + ps[:ps_len] + b'\x00' + bytes(block)
+
+
+def _pkcs1_unpad(padded):
+    """
+    去除PKCS#1 v1.5 加密填充
+    :param padded: k字节的填充结果
+    :return: 明文块
+    """
+    separator = padded.find(b'\x00', 2)
+    if padded[:2] != b'\x00\x02' or separator < 10:
+        raise ValueError("解密失败：填充格式错误")
+    return padded[separator + 1:]
 
 
 class RSA:
     """RSA加密算法实现类"""
     
-    def __init__(self, key_size=512):
+    def __init__(self, key_size=512, num_primes=2):
         """
         初始化RSA对象
         :param key_size: 密钥长度（位）
+        :param num_primes: 模数n的素因子个数，大于2时为多素数RSA，公钥格式不变
         """
+        if num_primes < 2:
+            raise ValueError("素因子个数至少为2")
+        if key_size // num_primes < 2:
+            raise ValueError("密钥长度太小，无法分成指定个数的素因子")
         self.key_size = key_size
+        self.num_primes = num_primes
         self.public_key = None
         self.private_key = None
+        # 素数生成统计：检查过的候选数、被筛掉的候选数、Miller-Rabin排除的候选数、找到的素数个数
+        self.prime_stats = {'candidates': 0, 'sieve_rejected': 0, 'miller_rabin_rejected': 0, 'primes': 0}
+        # 最近一次生成密钥时素数搜索的 (墙钟时间, 全部进程CPU时间)，单位秒
+        self.prime_time = None
     
-    def _is_prime(self, n, k=5):
+    def _is_prime(self, n, k=None):
         """
-        Miller-Rabin素性检测
+        素性检测：先用小素数试除，再做Miller-Rabin检测
         :param n: 待检测的数
-        :param k: 检测轮数
+        :param k: Miller-Rabin检测轮数，为None时按位数选择
         :return: True表示可能是素数，False表示一定不是素数
         """
         if n < 2:
             return False
-        if n == 2 or n == 3:
+        for p in SMALL_PRIMES:
+            if n % p == 0:
+                return n == p
+        # 没有小于上限的因子且小于上限的平方，必为素数
+        if n < _SMALL_PRIME_LIMIT * _SMALL_PRIME_LIMIT:
             return True
-        if n % 2 == 0:
-            return False
         
+        return self._miller_rabin(n, k or _miller_rabin_rounds(n.bit_length()))
+    
+    def _miller_rabin(self, n, k):
+        """
+        Miller-Rabin素性检测
+        :param n: 待检测的奇数（大于3）
+        :param k: 检测轮数
+        :return: True表示可能是素数，False表示一定不是素数
+        """
         # 将n-1表示为2^r * d的形式
         r, d = 0, n - 1
         while d % 2 == 0:
@@ -58,19 +321,69 @@ class RSA:
     def _generate_prime(self, bits):
         """
         生成指定位数的素数
+        从随机奇数起点开始，在连续的奇数窗口上用小素数表筛去有小因子的候选，
+        只对筛后剩下的候选做Miller-Rabin检测；窗口内没有素数时换一个随机起点
         :param bits: 素数的位数
         :return: 素数
         """
+        if bits < 2:
+            raise ValueError("素数位数至少为2")
+        stats = self.prime_stats
+        
+        # 位数太小时候选可能就是表中的小素数，直接逐个检测
+        if bits <= _SIEVE_MIN_BITS:
+            while True:
+                num = random.getrandbits(bits) | _top_bits(bits) | (1 if bits > 2 else 0)
+                stats['candidates'] += 1
+                if self._is_prime(num):
+                    stats['primes'] += 1
+                    return num
+        
+        rounds = _miller_rabin_rounds(bits)
         while True:
-            # 生成随机奇数
-            num = random.getrandbits(bits)
-            # 确保最高位为1
-            num |= (1 << (bits - 1))
-            # 确保为奇数
-            num |= 1
-            
-            if self._is_prime(num):
-                return num
+            # 随机奇数起点，确保最高两位为1（窗口不会超出bits位，窗口内的候选也是如此）
+            start = random.getrandbits(bits) | _top_bits(bits) | 1
+            prime = self._search_window(start, bits, rounds)
+            if prime is not None:
+                return prime
+    
+    def _search_window(self, start, bits, rounds, stop_event=None):
+        """
+        在 start 开始的连续奇数窗口中寻找素数
+        :param start: 窗口起点（bits位奇数）
+        :param bits: 素数的位数
+        :param rounds: Miller-Rabin检测轮数
+        :param stop_event: 可选的停止标志，置位后放弃本窗口
+        :return: 窗口中的第一个素数，没有时返回None
+        """
+        stats = self.prime_stats
+        # 窗口第i项为 start + 2i，不能超出bits位
+        window = min(_SIEVE_WINDOW, (((1 << bits) - 1 - start) >> 1) + 1)
+        
+        sieve = bytearray(b'\x01') * window
+        for p in SMALL_PRIMES[1:]:
+            # start + 2i ≡ 0 (mod p) 的最小i，(p+1)/2 为2模p的逆元
+            i = (p - start % p) * ((p + 1) >> 1) % p
+            if i < window:
+                sieve[i::p] = bytes((window - 1 - i) // p + 1)
+        
+        tested = 0
+        for i in compress(range(window), sieve):
+            if stop_event is not None and stop_event.is_set():
+                window = i
+                break
+            tested += 1
+            candidate = start + 2 * i
+            if self._miller_rabin(candidate, rounds):
+                stats['candidates'] += i + 1
+                stats['sieve_rejected'] += i + 1 - tested
+                stats['miller_rabin_rejected'] += tested - 1
+                stats['primes'] += 1
+                return candidate
+        stats['candidates'] += window
+        stats['sieve_rejected'] += window - tested
+        stats['miller_rabin_rejected'] += tested
+        return None
     
     def _gcd(self, a, b):
         """
@@ -110,29 +423,55 @@ class RSA:
             raise ValueError("模逆元不存在")
         return x % phi
     
-    def generate_keys(self):
+    def generate_keys(self, workers=1, verbose=True):
         """
         生成公钥和私钥
+        :param workers: 生成素数的进程数，大于1时用进程池同时搜索各素因子，为None时使用全部CPU核
+        :param verbose: 是否打印生成进度
         :return: (public_key, private_key)
         """
-        print(f"正在生成 {self.key_size} 位RSA密钥对...")
+        log = print if verbose else (lambda *args: None)
+        log(f"正在生成 {self.key_size} 位RSA密钥对...")
+        workers = workers or os.cpu_count() or 1
+        # 各素因子的位数之和为密钥长度，除不尽的位数分给前面的素数
+        count = self.num_primes
+        sizes = [self.key_size // count + (1 if i < self.key_size % count else 0) for i in range(count)]
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
         
-        # 生成两个大素数p和q
-        print("生成素数p...")
-        p = self._generate_prime(self.key_size // 2)
+        primes = []
+        if workers > 1 and min(sizes) > _SIEVE_MIN_BITS:
+            # 多个进程同时搜索，每种位数取最先找到的若干个不同素数
+            log(f"使用 {workers} 个进程同时生成 {count} 个素因子...")
+            worker_cpu = 0.0
+            for bits in sorted(set(sizes), reverse=True):
+                found, cpu_time = _generate_primes_parallel(self, bits, sizes.count(bits), workers)
+                primes += found
+                worker_cpu += cpu_time
+        else:
+            worker_cpu = 0.0
+            # 逐个生成大素数，确保互不相等
+            for i, bits in enumerate(sizes):
+                log(f"生成第 {i + 1} 个素数...")
+                prime = self._generate_prime(bits)
+                while prime in primes:
+                    prime = self._generate_prime(bits)
+                primes.append(prime)
         
-        print("生成素数q...")
-        q = self._generate_prime(self.key_size // 2)
+        # 三个及以上素因子的乘积可能比密钥长度少一位，重新生成最后一个素数直到位数正确
+        while math.prod(primes).bit_length() != self.key_size:
+            prime = self._generate_prime(sizes[-1])
+            if prime not in primes[:-1]:
+                primes[-1] = prime
         
-        # 确保p和q不相等
-        while p == q:
-            q = self._generate_prime(self.key_size // 2)
+        self.prime_time = (time.perf_counter() - wall_start,
+                           time.process_time() - cpu_start + worker_cpu)
         
-        # 计算n = p * q
-        n = p * q
+        # 计算n = p * q * ...
+        n = math.prod(primes)
         
-        # 计算欧拉函数φ(n) = (p-1)(q-1)
-        phi = (p - 1) * (q - 1)
+        # 计算欧拉函数φ(n) = (p-1)(q-1)...
+        phi = math.prod(prime - 1 for prime in primes)
         
         # 选择公钥指数e (通常选择65537)
         e = 65537
@@ -142,15 +481,16 @@ class RSA:
             e = random.randrange(3, phi, 2)
         
         # 计算私钥指数d (d是e在模φ(n)下的逆元)
-        print("计算私钥...")
+        log("计算私钥...")
         d = self._mod_inverse(e, phi)
         
         # 公钥 (e, n)
-        self.public_key = (e, n)
-        # 私钥 (d, n)
-        self.private_key = (d, n)
+        self.public_key = RSAPublicKey(e, n)
+        # 私钥 (d, n)，同时保存全部素因子及CRT参数
+        self.private_key = RSAPrivateKey(d, n, *primes)
         
-        print("密钥生成完成！")
+        wall, cpu = self.prime_time
+        log(f"密钥生成完成！素数搜索用时 {wall:.2f} 秒（CPU时间 {cpu:.2f} 秒）")
         
         return self.public_key, self.private_key
     
@@ -158,7 +498,7 @@ class RSA:
         """
         使用公钥加密
         :param plaintext: 明文字符串
-        :param public_key: 公钥 (e, n)，如果为None则使用对象的公钥
+        :param public_key: 公钥 RSAPublicKey 或 (e, n)，如果为None则使用对象的公钥
         :return: 加密后的数字列表
         """
         if public_key is None:
@@ -172,6 +512,11 @@ class RSA:
         # 将字符串转换为字节，然后转换为数字
         plaintext_bytes = plaintext.encode('utf-8')
         
+        # 公钥对象已经计算了密文表（precompute()），直接查表
+        if isinstance(public_key, RSAPublicKey) and public_key.has_byte_table:
+            table = public_key.byte_table()
+            return [table[byte] for byte in plaintext_bytes]
+        
         # 分块加密（每块不能超过n）
         ciphertext = []
         for byte in plaintext_bytes:
@@ -185,7 +530,7 @@ class RSA:
         """
         使用私钥解密
         :param ciphertext: 加密后的数字列表
-        :param private_key: 私钥 (d, n)，如果为None则使用对象的私钥
+        :param private_key: 私钥 RSAPrivateKey 或 (d, n)，如果为None则使用对象的私钥
         :return: 解密后的明文字符串
         """
         if private_key is None:
@@ -194,13 +539,18 @@ class RSA:
         if private_key is None:
             raise ValueError("请先生成密钥或提供私钥")
         
-        d, n = private_key
+        # 私钥对象带有反查表，已知的密文直接查表（precompute() 后包含全部字节值）
+        lookup = private_key.byte_cache() if isinstance(private_key, RSAPrivateKey) else None
         
         # 解密每个数字
         plaintext_bytes = []
         for encrypted in ciphertext:
-            # 解密：m = c^d mod n
-            decrypted = pow(encrypted, d, n)
+            decrypted = lookup.get(encrypted) if lookup is not None else None
+            if decrypted is None:
+                # 解密：m = c^d mod n（有CRT参数时分模各素因子计算）
+                decrypted = _private_pow(encrypted, private_key)
+                if lookup is not None and decrypted < 256:
+                    lookup[encrypted] = decrypted
             plaintext_bytes.append(decrypted)
         
         # 转换回字符串
@@ -208,6 +558,61 @@ class RSA:
         
         return plaintext
     
+    def encrypt_message(self, message, public_key=None):
+        """
+        分块加密任意字节串：每块装入模数允许的最多字节（模数字节数-11），
+        按PKCS#1 v1.5填充后转为整数做一次幂运算
+        :param message: 明文（字符串按UTF-8编码，或字节串）
+        :param public_key: 公钥 (e, n)，如果为None则使用对象的公钥
+        :return: 加密后的数字列表，每块一个
+        """
+        if public_key is None:
+            public_key = self.public_key
+        
+        if public_key is None:
+            raise ValueError("请先生成密钥或提供公钥")
+        
+        e, n = public_key
+        if isinstance(message, str):
+            message = message.encode('utf-8')
+        
+        k = (n.bit_length() + 7) // 8
+        capacity = k - _PKCS1_OVERHEAD
+        if capacity < 1:
+            raise ValueError("模数太小，无法分块加密")
+        
+        # 空消息也加密为一个块，解密时才能与“无密文”区分
+        view = memoryview(message)
+        ciphertext = []
+        for start in range(0, max(len(view), 1), capacity):
+            padded = _pkcs1_pad(view[start:start + capacity], k)
+            ciphertext.append(pow(int.from_bytes(padded, 'big'), e, n))
+        return ciphertext
+    
+    def decrypt_message(self, ciphertext, private_key=None):
+        """
+        解密 encrypt_message 的结果
+        :param ciphertext: 加密后的数字列表
+        :param private_key: 私钥 RSAPrivateKey 或 (d, n)，如果为None则使用对象的私钥
+        :return: 明文字节串
+        """
+        if private_key is None:
+            private_key = self.private_key
+        
+        if private_key is None:
+            raise ValueError("请先生成密钥或提供私钥")
+        
+        n = private_key[1]
+        k = (n.bit_length() + 7) // 8
+        
+        plaintext = bytearray()
+        for encrypted in ciphertext:
+            if not 0 <= encrypted < n:
+                raise ValueError("密文超出模数范围")
+            padded = _private_pow(encrypted, private_key).to_bytes(k, 'big')
+            plaintext += _pkcs1_unpad(padded)
+        return bytes(plaintext)
+    
     def encrypt_number(self, message, public_key=None):
         """
         加密单个数字
@@ -232,7 +637,7 @@ class RSA:
         """
         解密单个数字
         :param ciphertext: 加密后的数字
-        :param private_key: 私钥
+        :param private_key: 私钥 RSAPrivateKey 或 (d, n)
         :return: 解密后的数字
         """
         if private_key is None:
@@ -241,9 +646,389 @@ class RSA:
         if private_key is None:
             raise ValueError("请先生成密钥或提供私钥")
         
-        d, n = private_key
+        return _private_pow(ciphertext, private_key)
+    
+    def decrypt_batch(self, ciphertexts, private_key=None, workers=None, chunk_size=None):
+        """
+        批量解密数字：重复的密文只解密一次，不同的密文分块交给进程池，结果按输入顺序返回
+        :param ciphertexts: 密文数字序列
+        :param private_key: 私钥 RSAPrivateKey 或 (d, n)，如果为None则使用对象的私钥
+        :param workers: 进程数，默认为CPU核数，为1时在当前进程解密
+        :param chunk_size: 每个任务的密文个数，默认按数量与进程数选择
+        :return: 解密后的数字列表
+        """
+        if private_key is None:
+            private_key = self.private_key
+        
+        if private_key is None:
+            raise ValueError("请先生成密钥或提供私钥")
+        
+        ciphertexts = list(ciphertexts)
+        unique = list(dict.fromkeys(ciphertexts))
+        workers = workers or os.cpu_count() or 1
+        
+        if workers == 1 or len(unique) < _BATCH_MIN_PARALLEL:
+            results = {c: _private_pow(c, private_key) for c in unique}
+        else:
+            chunk_size = chunk_size or _batch_chunk_size(len(unique), workers)
+            with _decrypt_pool(private_key, workers) as executor:
+                chunks = [unique[i:i + chunk_size] for i in range(0, len(unique), chunk_size)]
+                results = _collect_chunks(chunks, [executor.submit(_decrypt_chunk, chunk) for chunk in chunks])
+        
+        return [results[c] for c in ciphertexts]
+    
+    def decrypt_stream(self, ciphertexts, private_key=None, workers=None, window=1 << 16, chunk_size=None):
+        """
+        流式批量解密：每次从输入中读取一个窗口的密文去重后并行解密，按输入顺序逐个产出结果，
+        下一个窗口在产出当前窗口结果前提交，内存占用只与窗口大小有关
+        :param ciphertexts: 密文数字的可迭代对象（可以是生成器）
+        :param private_key: 私钥 RSAPrivateKey 或 (d, n)，如果为None则使用对象的私钥
+        :param workers: 进程数，默认为CPU核数，为1时在当前进程解密
+        :param window: 每个窗口的密文个数
+        :param chunk_size: 每个任务的密文个数，默认按窗口大小与进程数选择
+        :return: 逐个产出解密后数字的生成器
+        """
+        if private_key is None:
+            private_key = self.private_key
+        
+        if private_key is None:
+            raise ValueError("请先生成密钥或提供私钥")
+        
+        workers = workers or os.cpu_count() or 1
+        iterator = iter(ciphertexts)
+        
+        if workers == 1:
+            while True:
+                batch = list(islice(iterator, window))
+                if not batch:
+                    return
+                results = {c: _private_pow(c, private_key) for c in dict.fromkeys(batch)}
+                yield from (results[c] for c in batch)
+        
+        chunk_size = chunk_size or _batch_chunk_size(window, workers)
+        executor = _decrypt_pool(private_key, workers)
+        try:
+            # 已提交的窗口：(窗口内密文, 去重后的分块, 各分块的任务)
+            pending = deque()
+            while True:
+                batch = list(islice(iterator, window))
+                if batch:
+                    unique = list(dict.fromkeys(batch))
+                    chunks = [unique[i:i + chunk_size] for i in range(0, len(unique), chunk_size)]
+                    pending.append((batch, chunks, [executor.submit(_decrypt_chunk, chunk) for chunk in chunks]))
+                    # 保持有一个窗口在后台计算
+                    if len(pending) < 2:
+                        continue
+                if not pending:
+                    return
+                batch, chunks, futures = pending.popleft()
+                results = _collect_chunks(chunks, futures)
+                yield from (results[c] for c in batch)
+        finally:
+            executor.shutdown(cancel_futures=True)
+    
+    def sign(self, message, private_key=None):
+        """
+        RSA-SHA1签名：用SHA-1计算摘要，按PKCS#1 v1.5填充后做私钥运算（有CRT参数时使用CRT）
+        :param message: 消息（字符串按UTF-8编码，或字节串）
+        :param private_key: 私钥 RSAPrivateKey 或 (d, n)，如果为None则使用对象的私钥
+        :return: 签名整数
+        """
+        if private_key is None:
+            private_key = self.private_key
+        
+        if private_key is None:
+            raise ValueError("请先生成密钥或提供私钥")
+        
+        n = private_key[1]
+        k = (n.bit_length() + 7) // 8
+        encoded = _signature_prefix(k) + _sha1_digest(message)
+        return _private_pow(int.from_bytes(encoded, 'big'), private_key)
+    
+    def verify(self, message, signature, public_key=None):
+        """
+        验证RSA-SHA1签名
+        :param message: 消息（字符串按UTF-8编码，或字节串）
+        :param signature: 签名整数
+        :param public_key: 公钥 (e, n)，如果为None则使用对象的公钥
+        :return: 签名是否有效
+        """
+        if public_key is None:
+            public_key = self.public_key
         
-        return pow(ciphertext, d, n)
+        if public_key is None:
+            raise ValueError("请先生成密钥或提供公钥")
+        
+        e, n = public_key
+        k = (n.bit_length() + 7) // 8
+        return _verify_signature(message, signature, e, n, _signature_prefix(k))
+    
+    def verify_batch(self, items, public_key=None, workers=None, chunk_size=None):
+        """
+        批量验证同一公钥下的签名，分块交给进程池；
+        每个工作进程初始化时准备一次公钥与填充前缀，各任务只传送消息和签名
+        :param items: (消息, 签名) 序列
+        :param public_key: 公钥 (e, n)，如果为None则使用对象的公钥
+        :param workers: 进程数，默认为CPU核数，为1时在当前进程验证
+        :param chunk_size: 每个任务的签名个数，默认按数量与进程数选择
+        :return: 与输入顺序一致的布尔值列表
+        """
+        if public_key is None:
+            public_key = self.public_key
+        
+        if public_key is None:
+            raise ValueError("请先生成密钥或提供公钥")
+        
+        items = list(items)
+        workers = workers or os.cpu_count() or 1
+        
+        if workers == 1 or len(items) < _BATCH_MIN_PARALLEL:
+            # 在当前进程验证时使用局部的公钥参数，不经过进程全局变量，多线程同时验证互不影响
+            return _verify_chunk(items, _verify_context(public_key))
+        
+        chunk_size = chunk_size or _batch_chunk_size(len(items), workers)
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_verify_worker,
+                                 initargs=(public_key,)) as executor:
+            results = []
+            for chunk_result in executor.map(_verify_chunk, chunks):
+                results += chunk_result
+        return results
+
+
+# SHA-1 的 DigestInfo DER编码前缀（PKCS#1 v1.5 签名）
+_SHA1_DIGEST_INFO = bytes.fromhex('3021300906052b0e03021a05000414')
+
+
+def _sha1_digest(message):
+    """计算消息的SHA-1摘要（20字节）"""
+    return SHA1(message).digest()
+
+
+def _signature_prefix(k):
+    """
+    PKCS#1 v1.5 签名编码中摘要之前的固定部分：0x00 0x01 0xFF... 0x00 DigestInfo前缀
+    :param k: 模数字节数
+    :return: 前缀字节串，后接20字节摘要即为k字节的编码结果
+    """
+    padding = k - len(_SHA1_DIGEST_INFO) - 20 - 3
+    if padding < 8:
+        raise ValueError("模数太小，无法进行SHA-1签名（至少需要368位）")
+    return b'\x00\x01' + b'\xff' * padding + b'\x00' + _SHA1_DIGEST_INFO
+
+
+def _verify_signature(message, signature, e, n, prefix):
+    """
+    验证签名：对签名做公钥运算，与消息摘要的编码结果比较
+    :param prefix: _signature_prefix 的结果
+    :return: 签名是否有效
+    """
+    if not 0 <= signature < n:
+        return False
+    encoded = pow(signature, e, n).to_bytes(len(prefix) + 20, 'big')
+    return encoded[:len(prefix)] == prefix and encoded[len(prefix):] == _sha1_digest(message)
+
+
+# 批量验证签名的工作进程中准备好的 (e, n, 填充前缀)，只由进程池初始化函数设置
+_VERIFY_CONTEXT = None
+
+
+def _verify_context(public_key):
+    """
+    准备验证签名所需的公钥参数
+    :param public_key: 公钥 (e, n)
+    :return: (e, n, 填充前缀)
+    """
+    e, n = public_key
+    return e, n, _signature_prefix((n.bit_length() + 7) // 8)
+
+
+def _init_verify_worker(public_key):
+    """工作进程初始化：准备公钥与填充前缀"""
+    global _VERIFY_CONTEXT
+    _VERIFY_CONTEXT = _verify_context(public_key)
+
+
+def _verify_chunk(items, context=None):
+    """
+    验证一组 (消息, 签名)
+    :param items: (消息, 签名) 序列
+    :param context: _verify_context 的结果，为None时使用工作进程初始化时准备的参数
+    :return: 布尔值列表
+    """
+    e, n, prefix = context if context is not None else _VERIFY_CONTEXT
+    return [_verify_signature(message, signature, e, n, prefix) for message, signature in items]
+
+
+# 批量解密的工作进程中使用的私钥，由进程池初始化函数设置，每个任务只需传送密文
+_DECRYPT_KEY = None
+
+# 去重后少于该数量时直接在当前进程解密
+_BATCH_MIN_PARALLEL = 64
+
+
+def _init_decrypt_worker(private_key):
+    """工作进程初始化：保存私钥"""
+    global _DECRYPT_KEY
+    _DECRYPT_KEY = private_key
+
+
+def _decrypt_chunk(values):
+    """工作进程：解密一组密文"""
+    private_key = _DECRYPT_KEY
+    return [_private_pow(c, private_key) for c in values]
+
+
+def _decrypt_pool(private_key, workers):
+    """创建批量解密用的进程池"""
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_decrypt_worker,
+                               initargs=(private_key,))
+
+
+def _batch_chunk_size(count, workers):
+    """
+    选择每个任务的密文个数：每个进程大约分到8个任务以均衡负载，
+    同时不少于16个（摊薄任务调度开销），不多于1024个（限制单次传送的数据量）
+    """
+    return max(16, min(1024, count // (workers * 8)))
+
+
+def _collect_chunks(chunks, futures):
+    """
+    汇总各分块的解密结果
+    :param chunks: 密文分块列表
+    :param futures: 与分块一一对应的任务
+    :return: {密文: 明文} 字典
+    """
+    results = {}
+    for chunk, future in zip(chunks, futures):
+        results.update(zip(chunk, future.result()))
+    return results
+
+
+# 工作进程中的停止标志，由进程池初始化函数设置
+_STOP_EVENT = None
+
+
+def _init_prime_worker(stop_event):
+    """工作进程初始化：保存共享的停止标志"""
+    global _STOP_EVENT
+    _STOP_EVENT = stop_event
+
+
+def _prime_window_task(bits, seed):
+    """
+    工作进程：从种子确定的随机起点搜索一个窗口
+    （进程池子进程复制了父进程的随机数状态，因此起点由父进程分配的种子决定）
+    :param bits: 素数的位数
+    :param seed: 随机种子
+    :return: (素数或None, 统计信息, 本任务的CPU时间)
+    """
+    cpu_start = time.process_time()
+    rsa = RSA()
+    start = random.Random(seed).getrandbits(bits) | _top_bits(bits) | 1
+    prime = rsa._search_window(start, bits, _miller_rabin_rounds(bits), _STOP_EVENT)
+    return prime, rsa.prime_stats, time.process_time() - cpu_start
+
+
+def _generate_primes_parallel(rsa, bits, count, workers):
+    """
+    用进程池同时搜索多个素数，找够后通知其余任务停止
+    :param rsa: 汇总统计信息的RSA对象
+    :param bits: 素数的位数
+    :param count: 需要的不同素数个数
+    :param workers: 进程数
+    :return: (素数列表, 工作进程CPU时间之和)
+    """
+    stop_event = multiprocessing.Event()
+    primes = []
+    cpu = 0.0
+    running = set()
+    
+    def collect(future):
+        nonlocal cpu
+        prime, stats, cpu_time = future.result()
+        cpu += cpu_time
+        for name, value in stats.items():
+            rsa.prime_stats[name] += value
+        if prime is not None and prime not in primes:
+            primes.append(prime)
+    
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_prime_worker,
+                                   initargs=(stop_event,))
+    try:
+        while len(primes) < count:
+            while len(running) < workers:
+                running.add(executor.submit(_prime_window_task, bits, random.getrandbits(64)))
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                collect(future)
+    finally:
+        stop_event.set()
+        executor.shutdown(cancel_futures=True)
+    # 收到停止通知后提前结束的任务也计入CPU时间
+    for future in running:
+        if not future.cancelled():
+            collect(future)
+    
+    return primes[:count], cpu
+
+
+def _top_bits(bits):
+    """
+    素数候选的最高两位：两个这样的素数之积恰好为 2*bits 位；
+    多个素数之积仍可能少一位，由 generate_keys 检查模数位数
+    :param bits: 素数的位数
+    :return: 掩码
+    """
+    return 3 << (bits - 2) if bits >= 2 else 1
+
+
+def _sieve_primes(limit):
+    """
+    埃拉托斯特尼筛法求小于limit的全部素数
+    :param limit: 上限
+    :return: 素数元组
+    """
+    sieve = bytearray(b'\x01') * limit
+    sieve[:2] = b'\x00\x00'
+    for i in range(2, int(limit ** 0.5) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes((limit - 1 - i * i) // i + 1)
+    return tuple(compress(range(limit), sieve))
+
+
+def _miller_rabin_rounds(bits):
+    """
+    随机候选的Miller-Rabin检测轮数，使误判概率低于2^-80（取值同OpenSSL的BN_prime_checks_for_size）
+    :param bits: 候选位数
+    :return: 检测轮数
+    """
+    if bits >= 3747:
+        return 3
+    if bits >= 1345:
+        return 4
+    if bits >= 476:
+        return 5
+    if bits >= 400:
+        return 6
+    if bits >= 347:
+        return 7
+    if bits >= 308:
+        return 8
+    if bits >= 55:
+        return 27
+    return 34
+
+
+# 试除与筛选用的小素数表
+_SMALL_PRIME_LIMIT = 1 << 14
+SMALL_PRIMES = _sieve_primes(_SMALL_PRIME_LIMIT)
+
+# 每个筛选窗口包含的奇数候选个数
+_SIEVE_WINDOW = 4096
+# 不超过该位数的素数直接逐个检测（候选可能与表中小素数相等）
+_SIEVE_MIN_BITS = 16
 
 
 def test_rsa():
@@ -315,8 +1100,422 @@ def test_rsa():
     else:
         print("✗ 数字加密解密失败！")
     
+    # 测试CRT私钥运算
+    print("\n" + "=" * 60)
+    print("测试3: CRT私钥运算")
+    print("=" * 60)
+    
+    d, n = private_key
+    samples = [0, 1, 2, message_num, n - 1] + [random.randrange(n) for _ in range(20)]
+    crt_ok = all(_private_pow(c, private_key) == pow(c, d, n) for c in samples)
+    print(f"\nCRT结果与 pow(c, d, n) 一致: {'✓' if crt_ok else '✗'}")
+    plain_ok = rsa.decrypt(ciphertext, (d, n)) == plaintext
+    print(f"(d, n) 二元组私钥仍可解密: {'✓' if plain_ok else '✗'}")
+    
+    # 测试分块加密
+    print("\n" + "=" * 60)
+    print("测试4: 分块加密任意字节")
+    print("=" * 60)
+    
+    for message in (b"", b"\x00\x00\xff", os.urandom(21), os.urandom(22), os.urandom(500)):
+        blocks = rsa.encrypt_message(message)
+        ok = rsa.decrypt_message(blocks) == message
+        print(f"\n{len(message)} 字节 -> {len(blocks)} 块: {'✓ 还原成功' if ok else '✗ 还原失败'}")
+    text = "RSA 分块加密"
+    print(f"字符串: {'✓' if rsa.decrypt_message(rsa.encrypt_message(text)).decode('utf-8') == text else '✗'}")
+    
+    # 测试逐字节查表
+    print("\n" + "=" * 60)
+    print("测试5: 逐字节加解密查表")
+    print("=" * 60)
+    
+    e, n = public_key
+    text = "查表 lookup ✓"
+    plain_cipher = rsa.encrypt(text)
+    print(f"\n未调用precompute()时不建表: {'✓' if not public_key.has_byte_table else '✗'}")
+    private_key.clear_byte_cache()
+    rsa.decrypt(plain_cipher)
+    print(f"解密只缓存出现过的密文: {'✓' if len(private_key.byte_cache()) == len(set(plain_cipher)) else '✗'}")
+    public_key.precompute()
+    private_key.precompute()
+    table_cipher = rsa.encrypt(text)
+    print(f"密文表与逐个幂运算一致: {'✓' if table_cipher == plain_cipher else '✗'}")
+    lookup = private_key.byte_lookup()
+    print(f"私钥反查表: {len(lookup)} 项 {'✓' if all(lookup[c] == b for b, c in enumerate(public_key.byte_table())) else '✗'}")
+    print(f"查表解密: {'✓' if rsa.decrypt(table_cipher) == text else '✗'}")
+    restored = pickle.loads(pickle.dumps(private_key))
+    print(f"序列化不携带缓存: {'✓' if restored._byte_lookup is None and restored == private_key else '✗'}")
+    
+    # 测试批量解密
+    print("\n" + "=" * 60)
+    print("测试6: 批量解密")
+    print("=" * 60)
+    
+    numbers = [random.randrange(n) for _ in range(150)]
+    numbers += numbers[:50]
+    random.shuffle(numbers)
+    batch = [rsa.encrypt_number(m) for m in numbers]
+    print(f"\n批量解密（2个进程）: {'✓' if rsa.decrypt_batch(batch, workers=2) == numbers else '✗'}")
+    print(f"批量解密（当前进程）: {'✓' if rsa.decrypt_batch(batch, workers=1) == numbers else '✗'}")
+    streamed = list(rsa.decrypt_stream(iter(batch), workers=2, window=70, chunk_size=16))
+    print(f"流式解密: {'✓' if streamed == numbers else '✗'}")
+    
+    # 测试签名
+    print("\n" + "=" * 60)
+    print("测试7: RSA-SHA1签名")
+    print("=" * 60)
+    
+    signer = RSA(key_size=512)
+    signer.generate_keys(verbose=False)
+    d, sign_n = signer.private_key
+    document = "这是一条需要签名的消息"
+    signature = signer.sign(document)
+    print(f"\n签名验证: {'✓ 有效' if signer.verify(document, signature) else '✗ 无效'}")
+    print(f"CRT签名与 (d, n) 签名一致: {'✓' if signer.sign(document, (d, sign_n)) == signature else '✗'}")
+    print(f"篡改消息: {'✓ 验证失败' if not signer.verify(document + '!', signature) else '✗ 仍然有效'}")
+    print(f"篡改签名: {'✓ 验证失败' if not signer.verify(document, signature ^ 1) else '✗ 仍然有效'}")
+    records = [(f"记录{i}", signer.sign(f"记录{i}")) for i in range(100)]
+    records[7] = (records[7][0], records[8][1])
+    expected = [i != 7 for i in range(100)]
+    print(f"批量验证（2个进程）: {'✓' if signer.verify_batch(records, workers=2) == expected else '✗'}")
+    print(f"批量验证（当前进程）: {'✓' if signer.verify_batch(records, workers=1) == expected else '✗'}")
+    
+    # 测试多素数RSA
+    print("\n" + "=" * 60)
+    print("测试8: 多素数RSA")
+    print("=" * 60)
+    
+    for num_primes in (3, 4):
+        multi = RSA(key_size=512, num_primes=num_primes)
+        multi_public, multi_private = multi.generate_keys(verbose=False)
+        d, n = multi_private
+        samples = [0, 1, n - 1] + [random.randrange(n) for _ in range(20)]
+        crt_ok = all(_private_pow(c, multi_private) == pow(c, d, n) for c in samples)
+        restored = pickle.loads(pickle.dumps(multi_private))
+        print(f"\n{num_primes}个素因子（n为{n.bit_length()}位）:")
+        print(f"  素因子: {'✓' if len(multi_private.primes) == num_primes else '✗'} "
+              f"{[prime.bit_length() for prime in multi_private.primes]} 位")
+        print(f"  多因子CRT与 pow(c, d, n) 一致: {'✓' if crt_ok else '✗'}")
+        round_trip = multi.decrypt_message(multi.encrypt_message(b'multi-prime')) == b'multi-prime'
+        print(f"  (e, n) 公钥加密、私钥解密: {'✓' if round_trip else '✗'}")
+        print(f"  签名验证: {'✓' if multi.verify('多素数', multi.sign('多素数')) else '✗'}")
+        print(f"  序列化后保留素因子: {'✓' if restored.primes == multi_private.primes else '✗'}")
+    
+    # 模数位数应等于密钥长度
+    lengths_ok = True
+    for key_size in (256, 257, 512):
+        for num_primes in (2, 3, 4):
+            for _ in range(5):
+                n = RSA(key_size=key_size, num_primes=num_primes).generate_keys(verbose=False)[0][1]
+                lengths_ok = lengths_ok and n.bit_length() == key_size
+    print(f"\n模数位数等于密钥长度（2/3/4个素因子）: {'✓' if lengths_ok else '✗'}")
+    
+    print("\n" + "=" * 60)
+
+
+def benchmark_rsa_crt(key_sizes=(512, 1024, 2048), count=50):
+    """
+    私钥运算速度测试：CRT与直接 pow(c, d, n) 对比
+    :param key_sizes: 参与测试的密钥长度
+    :param count: 每种密钥长度解密的次数
+    """
+    print("=" * 60)
+    print("RSA CRT 私钥运算速度测试")
+    print("=" * 60)
+    
+    for key_size in key_sizes:
+        rsa = RSA(key_size=key_size)
+        public_key, private_key = rsa.generate_keys()
+        d, n = private_key
+        ciphertexts = [rsa.encrypt_number(random.randrange(n)) for _ in range(count)]
+        
+        start = time.perf_counter()
+        for c in ciphertexts:
+            pow(c, d, n)
+        plain_elapsed = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        for c in ciphertexts:
+            _private_pow(c, private_key)
+        crt_elapsed = time.perf_counter() - start
+        
+        print(f"\n{key_size}位: 直接运算 {count / plain_elapsed:,.0f} 次/秒，"
+              f"CRT {count / crt_elapsed:,.0f} 次/秒，加速比 {plain_elapsed / crt_elapsed:.2f}")
+    
+    print("\n" + "=" * 60)
+
+
+def benchmark_multi_prime(key_sizes=(2048, 4096), prime_counts=(2, 3, 4), count=20):
+    """
+    多素数RSA速度测试：不同素因子个数下的密钥生成时间与CRT私钥运算速度
+    :param key_sizes: 参与测试的密钥长度
+    :param prime_counts: 参与测试的素因子个数
+    :param count: 每种配置解密的次数
+    """
+    print("=" * 60)
+    print("多素数RSA速度测试")
+    print("=" * 60)
+    
+    for key_size in key_sizes:
+        print(f"\n{key_size}位:")
+        baseline = None
+        for num_primes in prime_counts:
+            rsa = RSA(key_size=key_size, num_primes=num_primes)
+            start = time.perf_counter()
+            public_key, private_key = rsa.generate_keys(verbose=False)
+            keygen = time.perf_counter() - start
+            
+            n = public_key[1]
+            messages = [random.randrange(n) for _ in range(count)]
+            ciphertexts = [rsa.encrypt_number(m) for m in messages]
+            start = time.perf_counter()
+            decrypted = [_private_pow(c, private_key) for c in ciphertexts]
+            elapsed = time.perf_counter() - start
+            
+            rate = count / elapsed
+            baseline = baseline or rate
+            print(f"  {num_primes}个素因子: 密钥生成 {keygen:.2f} 秒，"
+                  f"解密 {rate:,.0f} 次/秒（相对2个素因子 {rate / baseline:.2f}倍） "
+                  f"{'✓' if decrypted == messages else '✗'}")
+    
+    print("\n" + "=" * 60)
+
+
+def benchmark_rsa_message(key_size=1024, size=1024):
+    """
+    消息加解密速度测试：分块加密与逐字节加密对比
+    :param key_size: 密钥长度
+    :param size: 消息字节数
+    """
+    print("=" * 60)
+    print("RSA 分块加密与逐字节加密对比")
+    print("=" * 60)
+    
+    rsa = RSA(key_size=key_size)
+    rsa.generate_keys()
+    message = bytes(random.randrange(32, 127) for _ in range(size)).decode('ascii')
+    
+    start = time.perf_counter()
+    per_byte = rsa.encrypt(message)
+    encrypt_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    rsa.decrypt(per_byte)
+    decrypt_elapsed = time.perf_counter() - start
+    print(f"\n逐字节: {len(per_byte)} 次幂运算，加密 {encrypt_elapsed * 1000:.1f} ms，解密 {decrypt_elapsed * 1000:.1f} ms")
+    
+    start = time.perf_counter()
+    blocks = rsa.encrypt_message(message)
+    block_encrypt = time.perf_counter() - start
+    start = time.perf_counter()
+    rsa.decrypt_message(blocks)
+    block_decrypt = time.perf_counter() - start
+    print(f"分块: {len(blocks)} 次幂运算，加密 {block_encrypt * 1000:.1f} ms，解密 {block_decrypt * 1000:.1f} ms")
+    print(f"加速比: 加密 {encrypt_elapsed / block_encrypt:.1f}，解密 {decrypt_elapsed / block_decrypt:.1f}")
+    
+    print("\n" + "=" * 60)
+
+
+def benchmark_prime_generation(key_sizes=(1024, 2048), count=4):
+    """
+    素数生成速度测试：筛选后再做Miller-Rabin，与逐个随机奇数直接做5轮Miller-Rabin对比
+    :param key_sizes: 密钥长度（每个密钥需要两个 key_size/2 位素数）
+    :param count: 每种长度生成的素数个数
+    """
+    print("=" * 60)
+    print("RSA 素数生成速度测试")
+    print("=" * 60)
+    
+    for key_size in key_sizes:
+        bits = key_size // 2
+        rsa = RSA(key_size=key_size)
+        
+        # 原实现：每次取新的随机奇数，直接做5轮Miller-Rabin
+        naive_candidates = 0
+        start = time.perf_counter()
+        for _ in range(count):
+            while True:
+                naive_candidates += 1
+                num = random.getrandbits(bits) | (1 << (bits - 1)) | 1
+                if rsa._miller_rabin(num, 5):
+                    break
+        naive_elapsed = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        for _ in range(count):
+            rsa._generate_prime(bits)
+        sieve_elapsed = time.perf_counter() - start
+        stats = rsa.prime_stats
+        
+        print(f"\n{key_size}位密钥（{bits}位素数，{_miller_rabin_rounds(bits)}轮Miller-Rabin）:")
+        print(f"  原实现: 每个素数 {naive_elapsed / count * 1000:.0f} ms，"
+              f"平均 {naive_candidates / count:.0f} 个候选全部做Miller-Rabin")
+        print(f"  筛选后: 每个素数 {sieve_elapsed / count * 1000:.0f} ms，"
+              f"平均 {stats['candidates'] / count:.0f} 个候选，筛掉 {stats['sieve_rejected'] / count:.0f} 个，"
+              f"Miller-Rabin排除 {stats['miller_rabin_rejected'] / count:.0f} 个")
+        print(f"  加速比: {naive_elapsed / sieve_elapsed:.1f}")
+    
+    print("\n" + "=" * 60)
+
+
+def benchmark_parallel_keygen(key_size=2048, repeat=2, workers_list=None):
+    """
+    多进程密钥生成测试：记录不同进程数下素数搜索的墙钟时间与CPU时间
+    :param key_size: 密钥长度
+    :param repeat: 每种进程数生成的密钥对数
+    :param workers_list: 参与测试的进程数，默认为1、2和CPU核数
+    """
+    print("=" * 60)
+    print("RSA 多进程密钥生成测试")
+    print("=" * 60)
+    
+    cores = os.cpu_count() or 1
+    workers_list = workers_list or sorted({1, 2, cores})
+    print(f"\n密钥长度: {key_size}，CPU核数: {cores}")
+    
+    for workers in workers_list:
+        wall = cpu = 0.0
+        for _ in range(repeat):
+            rsa = RSA(key_size=key_size)
+            rsa.generate_keys(workers=workers)
+            wall += rsa.prime_time[0]
+            cpu += rsa.prime_time[1]
+        print(f"  {workers} 个进程: 墙钟 {wall / repeat:.2f} 秒，CPU {cpu / repeat:.2f} 秒，"
+              f"CPU/墙钟 {cpu / wall:.2f}")
+    
+    print("\n" + "=" * 60)
+
+
+def benchmark_byte_tables(key_size=1024, size=1024):
+    """
+    逐字节加解密速度测试：查表与逐个幂运算对比
+    :param key_size: 密钥长度
+    :param size: 消息字节数
+    """
+    print("=" * 60)
+    print("RSA 逐字节加解密查表测试")
+    print("=" * 60)
+    
+    rsa = RSA(key_size=key_size)
+    public_key, private_key = rsa.generate_keys()
+    message = bytes(random.randrange(32, 127) for _ in range(size)).decode('ascii')
+    plain_public = tuple(public_key)
+    plain_private = tuple(private_key)
+    
+    start = time.perf_counter()
+    ciphertext = rsa.encrypt(message, plain_public)
+    plain_encrypt = time.perf_counter() - start
+    start = time.perf_counter()
+    rsa.decrypt(ciphertext, plain_private)
+    plain_decrypt = time.perf_counter() - start
+    
+    # 显式构建表
+    start = time.perf_counter()
+    public_key.precompute()
+    private_key.precompute()
+    build = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    rsa.encrypt(message)
+    table_encrypt = time.perf_counter() - start
+    start = time.perf_counter()
+    rsa.decrypt(ciphertext)
+    table_decrypt = time.perf_counter() - start
+    
+    print(f"\n{key_size}位密钥，{size} 字节消息:")
+    print(f"  逐个幂运算: 加密 {plain_encrypt * 1000:.1f} ms，解密 {plain_decrypt * 1000:.1f} ms")
+    print(f"  构建查表: {build * 1000:.1f} ms")
+    print(f"  查表: 加密 {table_encrypt * 1000:.2f} ms，解密 {table_decrypt * 1000:.2f} ms")
+    print(f"  加速比: 加密 {plain_encrypt / table_encrypt:.0f}，解密 {plain_decrypt / table_decrypt:.0f}")
+    
+    print("\n" + "=" * 60)
+
+
+def benchmark_decrypt_batch(key_size=1024, count=2000, duplicate_ratio=0.5):
+    """
+    批量解密速度测试
+    :param key_size: 密钥长度
+    :param count: 密文个数
+    :param duplicate_ratio: 重复密文的比例
+    """
+    print("=" * 60)
+    print("RSA 批量解密测试")
+    print("=" * 60)
+    
+    rsa = RSA(key_size=key_size)
+    public_key, _ = rsa.generate_keys()
+    distinct = [rsa.encrypt_number(random.randrange(public_key[1])) for _ in range(int(count * (1 - duplicate_ratio)))]
+    ciphertexts = [random.choice(distinct) for _ in range(count)]
+    cores = os.cpu_count() or 1
+    print(f"\n{count} 个密文，其中不同的 {len(set(ciphertexts))} 个，CPU核数: {cores}")
+    
+    start = time.perf_counter()
+    expected = [rsa.decrypt_number(c) for c in ciphertexts]
+    elapsed = time.perf_counter() - start
+    print(f"  逐个解密: {count / elapsed:,.0f} 个/秒")
+    
+    for workers in sorted({1, 2, cores}):
+        start = time.perf_counter()
+        result = rsa.decrypt_batch(ciphertexts, workers=workers)
+        batch_elapsed = time.perf_counter() - start
+        print(f"  decrypt_batch（{workers} 个进程）: {count / batch_elapsed:,.0f} 个/秒，"
+              f"加速比 {elapsed / batch_elapsed:.2f} {'✓' if result == expected else '✗'}")
+    
+    print("\n" + "=" * 60)
+
+
+def benchmark_signatures(key_size=1024, count=2000):
+    """
+    签名速度测试：签名（CRT与直接幂运算）、逐个验证与批量验证
+    :param key_size: 密钥长度
+    :param count: 签名个数
+    """
+    print("=" * 60)
+    print("RSA-SHA1 签名速度测试")
+    print("=" * 60)
+    
+    rsa = RSA(key_size=key_size)
+    _, private_key = rsa.generate_keys(verbose=False)
+    messages = [f"audit record {i:08d}".encode('ascii') for i in range(count)]
+    cores = os.cpu_count() or 1
+    print(f"\n{key_size}位密钥，{count} 条消息，CPU核数: {cores}")
+    
+    sign_count = max(1, count // 10)
+    start = time.perf_counter()
+    for message in messages[:sign_count]:
+        rsa.sign(message, tuple(private_key))
+    elapsed = time.perf_counter() - start
+    print(f"  签名（直接幂运算）: {sign_count / elapsed:,.0f} 个/秒")
+    
+    start = time.perf_counter()
+    signatures = [rsa.sign(message) for message in messages]
+    elapsed = time.perf_counter() - start
+    print(f"  签名（CRT）: {count / elapsed:,.0f} 个/秒")
+    items = list(zip(messages, signatures))
+    
+    start = time.perf_counter()
+    ok = all(rsa.verify(message, signature) for message, signature in items)
+    elapsed = time.perf_counter() - start
+    print(f"  逐个验证: {count / elapsed:,.0f} 个/秒 {'✓' if ok else '✗'}")
+    
+    for workers in sorted({1, 2, cores}):
+        start = time.perf_counter()
+        ok = all(rsa.verify_batch(items, workers=workers))
+        elapsed = time.perf_counter() - start
+        print(f"  verify_batch（{workers} 个进程）: {count / elapsed:,.0f} 个/秒 {'✓' if ok else '✗'}")
+    
     print("\n" + "=" * 60)
 
 
 if __name__ == "__main__":
-    test_rsa()
+    # 默认只运行测试；速度测试耗时较长，用 --benchmark 参数单独运行
+    if sys.argv[1:] == ['--benchmark']:
+        benchmark_rsa_crt()
+        benchmark_multi_prime()
+        benchmark_rsa_message()
+        benchmark_prime_generation()
+        benchmark_parallel_keygen()
+        benchmark_byte_tables()
+        benchmark_decrypt_batch()
+        benchmark_signatures()
+    else:
+        test_rsa()
@@ -0,0 +1,314 @@
+"""
+RSA 模数共享素因子审计（Bernstein 批量GCD）
+素数由非密码学随机数生成时，不同密钥可能用到相同的素因子，
+此时对两个模数求最大公约数即可分解二者。两两求GCD需要 O(n²) 次运算，
+这里先用乘积树求出全部模数之积P，再用余数树求出每个 P mod n_i²，
+最后 gcd(n_i, (P mod n_i²) / n_i) 就是 n_i 与其余模数的公共因子，
+总运算量约为 O(n log n) 次大整数乘除；同一层的结点互不依赖，用进程池并行计算
+"""
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from rsa import RSA
+
+# 一层结点数少于该值时在当前进程计算，省去进程间传送大整数的开销
+_PARALLEL_MIN_NODES = 64
+
+
+def read_moduli(path):
+    """
+    读取模数文件：每行一个模数，十进制或带0x前缀的十六进制，空行与#开头的注释行被忽略
+    :param path: 文件路径
+    :return: 模数列表
+    """
+    moduli = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                modulus = int(line, 0)
+            except ValueError:
+                raise ValueError(f"第{line_number}行不是有效的模数") from None
+            if modulus < 2:
+                raise ValueError(f"第{line_number}行的模数无效")
+            moduli.append(modulus)
+    return moduli
+
+
+def _multiply_pairs(values):
+    """
+    将相邻两项相乘（项数为奇数时最后一项原样保留）
+    :param values: 整数列表
+    :return: 上一层的结点列表
+    """
+    products = [values[i] * values[i + 1] for i in range(0, len(values) - 1, 2)]
+    if len(values) % 2:
+        products.append(values[-1])
+    return products
+
+
+def _reduce_nodes(task):
+    """
+    余数树的一段：第i个结点的值为父结点的值对该结点平方取模
+    :param task: (父结点的值, 本层结点)，本层结点从偶数序号开始，第i个的父结点为第 i // 2 个
+    :return: 本层结点的余数列表
+    """
+    parents, nodes = task
+    return [parents[i >> 1] % (node * node) for i, node in enumerate(nodes)]
+
+
+def _split(count, workers):
+    """
+    把一层的结点按偶数边界分段，每个进程大约分到两段
+    :param count: 结点数
+    :param workers: 进程数
+    :return: 每段的 (起点, 终点)
+    """
+    step = max(2, -(-count // (workers * 2)))
+    step += step % 2
+    return [(start, min(start + step, count)) for start in range(0, count, step)]
+
+
+def product_tree(moduli, executor=None, workers=1):
+    """
+    构造乘积树
+    :param moduli: 模数列表
+    :param executor: 进程池，为None时在当前进程计算
+    :param workers: 进程池的进程数，用于分段
+    :return: 各层结点列表，第0层为模数本身，最后一层只有全部模数之积
+    """
+    levels = [list(moduli)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        if executor is None or len(level) < _PARALLEL_MIN_NODES:
+            levels.append(_multiply_pairs(level))
+        else:
+            chunks = [level[start:end] for start, end in _split(len(level), workers)]
+            parts = executor.map(_multiply_pairs, chunks)
+            levels.append([value for part in parts for value in part])
+    return levels
+
+
+def remainder_tree(levels, executor=None, workers=1):
+    """
+    从乘积树的根向下计算余数树，叶结点为 P mod n_i²
+    :param levels: product_tree 的结果
+    :param executor: 进程池，为None时在当前进程计算
+    :param workers: 进程池的进程数，用于分段
+    :return: 每个模数对应的余数列表
+    """
+    remainders = levels[-1]
+    for level in reversed(levels[:-1]):
+        if executor is None or len(level) < _PARALLEL_MIN_NODES:
+            remainders = _reduce_nodes((remainders, level))
+        else:
+            tasks = [(remainders[start >> 1:(end + 1) >> 1], level[start:end])
+                     for start, end in _split(len(level), workers)]
+            remainders = [value for part in executor.map(_reduce_nodes, tasks) for value in part]
+    return remainders
+
+
+def batch_gcd(moduli, workers=None):
+    """
+    批量求每个模数与其余模数之积的最大公约数
+    :param moduli: 模数列表
+    :param workers: 进程数，默认为CPU核数，为1时在当前进程计算
+    :return: 与输入顺序一致的公约数列表，1表示与其他模数没有公共因子
+    """
+    moduli = list(moduli)
+    if len(moduli) < 2:
+        return [1] * len(moduli)
+    workers = workers or os.cpu_count() or 1
+    
+    if workers == 1 or len(moduli) < _PARALLEL_MIN_NODES:
+        levels = product_tree(moduli)
+        remainders = remainder_tree(levels)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            levels = product_tree(moduli, executor, workers)
+            remainders = remainder_tree(levels, executor, workers)
+    
+    return [math.gcd(n, r // n) for n, r in zip(moduli, remainders)]
+
+
+def audit_moduli(moduli, workers=None):
+    """
+    审计模数列表，找出与其他模数共享素因子的密钥并分解
+    公约数等于模数本身时（模数重复，或它的每个素因子都出现在其他模数中），
+    只在这些模数之间两两求GCD补充分解
+    :param moduli: 模数列表
+    :param workers: 进程数
+    :return: 发现问题的密钥列表，每项为字典：
+             index（序号）、modulus（模数）、factor（找到的因子，未能分解时为None）、
+             cofactor（余下的因子）、shared_with（共享因子的其他密钥序号）
+    """
+    moduli = list(moduli)
+    gcds = batch_gcd(moduli, workers)
+    weak = [i for i, g in enumerate(gcds) if g != 1]
+    
+    findings = []
+    for i in weak:
+        n = moduli[i]
+        factor = gcds[i]
+        shared_with = []
+        for j in weak:
+            if j != i and math.gcd(n, moduli[j]) != 1:
+                shared_with.append(j)
+        if factor == n:
+            # 与重复的模数无法得到真因子，尝试与其他有问题的模数求GCD
+            factor = None
+            for j in shared_with:
+                g = math.gcd(n, moduli[j])
+                if g != n:
+                    factor = g
+                    break
+        findings.append({
+            'index': i,
+            'modulus': n,
+            'factor': factor,
+            'cofactor': n // factor if factor else None,
+            'shared_with': shared_with,
+        })
+    return findings
+
+
+def _print_findings(findings, total):
+    """打印审计报告"""
+    print(f"共 {total} 个模数，发现 {len(findings)} 个有共享因子的密钥")
+    for finding in findings:
+        n = finding['modulus']
+        print(f"\n#{finding['index']} ({n.bit_length()}位) 与 {finding['shared_with']} 共享因子")
+        if finding['factor'] is None:
+            print("  模数重复，无法分解")
+        else:
+            print(f"  p = {finding['factor']}")
+            print(f"  q = {finding['cofactor']}")
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="RSA 模数共享素因子审计（批量GCD）")
+    parser.add_argument('input', help="模数文件，每行一个十进制或0x开头的十六进制模数")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="进程数（默认CPU核数）")
+    args = parser.parse_args(argv)
+    
+    start = time.perf_counter()
+    try:
+        moduli = read_moduli(args.input)
+        findings = audit_moduli(moduli, args.workers)
+    except (OSError, ValueError) as exc:
+        print(f"错误: {exc}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    
+    _print_findings(findings, len(moduli))
+    print(f"\n用时 {elapsed:.2f} 秒")
+    return 2 if findings else 0
+
+
+def _weak_moduli(count, key_size, shared):
+    """
+    生成测试用模数，其中若干对模数共享一个素因子
+    :param count: 模数个数
+    :param key_size: 模数位数
+    :param shared: 共享素因子的模数对 [(i, j), ...]
+    :return: 模数列表
+    """
+    rsa = RSA(key_size=key_size)
+    bits = key_size // 2
+    primes = [rsa._generate_prime(bits) for _ in range(2 * count)]
+    for i, j in shared:
+        primes[2 * j] = primes[2 * i]
+    return [primes[2 * i] * primes[2 * i + 1] for i in range(count)]
+
+
+def test_rsa_audit():
+    """测试批量GCD审计"""
+    print("=" * 60)
+    print("RSA 共享素因子审计测试")
+    print("=" * 60)
+    
+    shared = [(3, 50), (10, 99), (10, 120)]
+    moduli = _weak_moduli(150, 256, shared)
+    # 重复的模数
+    moduli.append(moduli[7])
+    expected = {3, 50, 10, 99, 120, 7, 150}
+    
+    pairwise = [math.gcd(n, math.prod(moduli[:i] + moduli[i + 1:])) for i, n in enumerate(moduli)]
+    for workers in (1, 2):
+        gcds = batch_gcd(moduli, workers)
+        print(f"\n批量GCD（{workers} 个进程）与逐个计算一致: {'✓' if gcds == pairwise else '✗'}")
+    
+    findings = audit_moduli(moduli, workers=2)
+    found = {finding['index'] for finding in findings}
+    print(f"找出共享因子的密钥: {'✓' if found == expected else '✗'} {sorted(found)}")
+    factored = all(finding['factor'] * finding['cofactor'] == finding['modulus']
+                   for finding in findings if finding['index'] not in (7, 150))
+    print(f"分解结果正确: {'✓' if factored else '✗'}")
+    duplicates = [finding['factor'] for finding in findings if finding['index'] in (7, 150)]
+    print(f"重复模数单独标出: {'✓' if duplicates == [None, None] else '✗'}")
+    print(f"没有问题时报告为空: {'✓' if not audit_moduli(_weak_moduli(20, 128, []), workers=1) else '✗'}")
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "moduli.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("# 测试模数\n")
+            for i, n in enumerate(moduli):
+                f.write(f"{hex(n) if i % 2 else n}\n\n")
+        print(f"读取模数文件: {'✓' if read_moduli(path) == moduli else '✗'}")
+    
+    print("\n" + "=" * 60)
+
+
+def benchmark_rsa_audit(key_size=512, counts=(250, 500, 1000)):
+    """
+    审计速度测试：批量GCD与两两求GCD对比
+    :param key_size: 模数位数
+    :param counts: 参与测试的模数个数
+    """
+    print("=" * 60)
+    print("RSA 共享素因子审计速度测试")
+    print("=" * 60)
+    
+    rsa = RSA(key_size=key_size)
+    cores = os.cpu_count() or 1
+    print(f"\nCPU核数: {cores}")
+    
+    for count in counts:
+        moduli = _weak_moduli(count, key_size, [(0, count - 1)])
+        
+        start = time.perf_counter()
+        pairwise = set()
+        for i in range(count):
+            for j in range(i + 1, count):
+                if rsa._gcd(moduli[i], moduli[j]) != 1:
+                    pairwise.update((i, j))
+        pairwise_elapsed = time.perf_counter() - start
+        
+        print(f"\n{count} 个 {key_size} 位模数: 两两求GCD {pairwise_elapsed:.2f} 秒")
+        for workers in sorted({1, cores}):
+            start = time.perf_counter()
+            found = {finding['index'] for finding in audit_moduli(moduli, workers)}
+            elapsed = time.perf_counter() - start
+            print(f"  批量GCD（{workers} 个进程）: {elapsed:.2f} 秒，加速比 {pairwise_elapsed / elapsed:.1f} "
+                  f"{'✓' if found == pairwise == {0, count - 1} else '✗'}")
+    
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    # 不带参数时只运行测试；速度测试耗时较长，用 --benchmark 参数单独运行
+    if sys.argv[1:] == ['--benchmark']:
+        benchmark_rsa_audit()
+    elif len(sys.argv) > 1:
+        sys.exit(main())
+    else:
+        test_rsa_audit()
@@ -0,0 +1,358 @@
+"""
+RSA 密钥与密文的紧凑二进制格式
+密钥：魔数 + 版本 + 整数个数，之后每个整数为 4字节长度前缀 + 大端序字节
+密文：魔数 + 版本 + 记录宽度（模数字节数），之后每个密文为定宽的大端序记录
+读写都按大块进行，记录在 memoryview 上切片解析，不构造中间字符串
+"""
+
+import io
+import random
+import struct
+import sys
+import time
+
+from rsa import RSA, RSAPrivateKey, RSAPublicKey
+
+PUBLIC_KEY_MAGIC = b'RSAP'
+PRIVATE_KEY_MAGIC = b'RSAS'
+CIPHERTEXT_MAGIC = b'RSAC'
+VERSION = 1
+
+_KEY_HEADER = struct.Struct('>4sBB')
+_CIPHERTEXT_HEADER = struct.Struct('>4sBI')
+_LENGTH = struct.Struct('>I')
+
+# 流式读写时每批处理的字节数
+_IO_BYTES = 1 << 20
+
+
+def _pack_integers(magic, values):
+    """
+    打包整数序列：头部 + 每个整数的长度前缀与大端序字节
+    :param magic: 魔数
+    :param values: 非负整数序列
+    :return: 字节串
+    """
+    output = bytearray(_KEY_HEADER.pack(magic, VERSION, len(values)))
+    for value in values:
+        if value < 0:
+            raise ValueError("密钥参数不能为负数")
+        raw = value.to_bytes((value.bit_length() + 7) // 8, 'big')
+        output += _LENGTH.pack(len(raw))
+        output += raw
+    return bytes(output)
+
+
+def _unpack_integers(magic, data):
+    """
+    解析 _pack_integers 的结果
+    :param magic: 期望的魔数
+    :param data: 字节串或memoryview
+    :return: 整数列表
+    """
+    view = memoryview(data)
+    if len(view) < _KEY_HEADER.size:
+        raise ValueError("数据过短，不是有效的密钥")
+    found_magic, version, count = _KEY_HEADER.unpack_from(view)
+    if found_magic != magic:
+        raise ValueError("密钥类型不匹配")
+    if version != VERSION:
+        raise ValueError(f"不支持的密钥格式版本: {version}")
+    
+    values = []
+    offset = _KEY_HEADER.size
+    for _ in range(count):
+        if offset + _LENGTH.size > len(view):
+            raise ValueError("密钥数据不完整")
+        (length,) = _LENGTH.unpack_from(view, offset)
+        offset += _LENGTH.size
+        if offset + length > len(view):
+            raise ValueError("密钥数据不完整")
+        values.append(int.from_bytes(view[offset:offset + length], 'big'))
+        offset += length
+    if offset != len(view):
+        raise ValueError("密钥数据末尾有多余字节")
+    return values
+
+
+def dump_public_key(public_key):
+    """
+    序列化公钥
+    :param public_key: (e, n)
+    :return: 字节串
+    """
+    e, n = public_key
+    return _pack_integers(PUBLIC_KEY_MAGIC, (e, n))
+
+
+def load_public_key(data):
+    """
+    反序列化公钥
+    :param data: dump_public_key 的结果
+    :return: RSAPublicKey
+    """
+    values = _unpack_integers(PUBLIC_KEY_MAGIC, data)
+    if len(values) != 2:
+        raise ValueError("公钥应包含2个整数")
+    return RSAPublicKey(*values)
+
+
+def dump_private_key(private_key):
+    """
+    序列化私钥，带有素因子时一并保存（多素数RSA依次保存全部素因子）
+    :param private_key: RSAPrivateKey 或 (d, n)
+    :return: 字节串
+    """
+    d, n = private_key
+    values = [d, n]
+    if isinstance(private_key, RSAPrivateKey) and private_key.has_crt:
+        values += private_key.primes
+    return _pack_integers(PRIVATE_KEY_MAGIC, values)
+
+
+def load_private_key(data):
+    """
+    反序列化私钥
+    :param data: dump_private_key 的结果
+    :return: RSAPrivateKey
+    """
+    values = _unpack_integers(PRIVATE_KEY_MAGIC, data)
+    if len(values) == 3:
+        raise ValueError("私钥应包含2个整数或至少4个整数")
+    return RSAPrivateKey(*values)
+
+
+def _record_width(n):
+    """模数n对应的密文记录宽度（字节）"""
+    return (n.bit_length() + 7) // 8
+
+
+def pack_ciphertexts(ciphertexts, n):
+    """
+    将密文打包为定宽记录
+    :param ciphertexts: 密文整数序列（均小于n）
+    :param n: 模数
+    :return: 字节串
+    """
+    buffer = io.BytesIO()
+    with CiphertextWriter(buffer, n) as writer:
+        writer.write_many(ciphertexts)
+    return buffer.getvalue()
+
+
+def unpack_ciphertexts(data):
+    """
+    解析定宽密文记录
+    :param data: 字节串或memoryview
+    :return: 密文整数列表
+    """
+    view = memoryview(data)
+    width = _parse_ciphertext_header(view[:_CIPHERTEXT_HEADER.size])
+    body = view[_CIPHERTEXT_HEADER.size:]
+    if len(body) % width != 0:
+        raise ValueError("密文数据长度不是记录宽度的整数倍")
+    return [int.from_bytes(body[i:i + width], 'big') for i in range(0, len(body), width)]
+
+
+def _parse_ciphertext_header(header):
+    """
+    解析密文头部
+    :param header: 头部字节
+    :return: 记录宽度
+    """
+    if len(header) < _CIPHERTEXT_HEADER.size:
+        raise ValueError("数据过短，不是有效的密文文件")
+    magic, version, width = _CIPHERTEXT_HEADER.unpack_from(header)
+    if magic != CIPHERTEXT_MAGIC:
+        raise ValueError("不是有效的密文文件")
+    if version != VERSION:
+        raise ValueError(f"不支持的密文格式版本: {version}")
+    if width == 0:
+        raise ValueError("密文记录宽度无效")
+    return width
+
+
+class CiphertextWriter:
+    """定宽密文记录的流式写入器"""
+    
+    def __init__(self, file, n):
+        """
+        创建写入器并写入头部
+        :param file: 以二进制写方式打开的文件对象
+        :param n: 模数，决定记录宽度
+        """
+        self._file = file
+        self.n = n
+        self.width = _record_width(n)
+        self.count = 0
+        self._buffer = bytearray()
+        file.write(_CIPHERTEXT_HEADER.pack(CIPHERTEXT_MAGIC, VERSION, self.width))
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+    
+    def write(self, ciphertext):
+        """
+        写入一个密文
+        :param ciphertext: 小于n的非负整数
+        """
+        self.write_many((ciphertext,))
+    
+    def write_many(self, ciphertexts):
+        """
+        写入多个密文，缓冲区达到批量大小时写出
+        :param ciphertexts: 密文整数的可迭代对象
+        """
+        width = self.width
+        n = self.n
+        buffer = self._buffer
+        for value in ciphertexts:
+            if not 0 <= value < n:
+                raise ValueError("密文超出模数范围")
+            buffer += value.to_bytes(width, 'big')
+            self.count += 1
+            if len(buffer) >= _IO_BYTES:
+                self.flush()
+    
+    def flush(self):
+        """写出缓冲区中的记录"""
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer.clear()
+
+
+class CiphertextReader:
+    """定宽密文记录的流式读取器，按大块读入复用的缓冲区并在memoryview上切片解析"""
+    
+    def __init__(self, file):
+        """
+        创建读取器并解析头部
+        :param file: 以二进制读方式打开的文件对象
+        """
+        self._file = file
+        self.width = _parse_ciphertext_header(file.read(_CIPHERTEXT_HEADER.size))
+        # 缓冲区大小取记录宽度的整数倍
+        self._buffer = bytearray(max(1, _IO_BYTES // self.width) * self.width)
+    
+    def __iter__(self):
+        for batch in self.batches():
+            yield from batch
+    
+    def batches(self):
+        """
+        逐批读取密文
+        :return: 每次产出一个密文整数列表的生成器
+        """
+        width = self.width
+        buffer = self._buffer
+        with memoryview(buffer) as view:
+            pending = 0
+            while True:
+                size = self._file.readinto(view[pending:])
+                if not size:
+                    break
+                size += pending
+                usable = size - size % width
+                yield [int.from_bytes(view[i:i + width], 'big') for i in range(0, usable, width)]
+                # 不足一条记录的尾部移到缓冲区开头
+                pending = size - usable
+                view[:pending] = view[usable:size]
+            if pending:
+                raise ValueError("密文文件末尾有不完整的记录")
+
+
+def test_rsa_binary():
+    """测试二进制序列化"""
+    print("=" * 60)
+    print("RSA 二进制序列化测试")
+    print("=" * 60)
+    
+    rsa = RSA(key_size=256)
+    public_key, private_key = rsa.generate_keys(verbose=False)
+    
+    public_data = dump_public_key(public_key)
+    private_data = dump_private_key(private_key)
+    loaded_public = load_public_key(public_data)
+    loaded_private = load_private_key(private_data)
+    print(f"\n公钥 {len(public_data)} 字节: {'✓' if loaded_public == public_key else '✗'}")
+    print(f"私钥 {len(private_data)} 字节: {'✓' if loaded_private == private_key and loaded_private.has_crt else '✗'}")
+    plain_private = load_private_key(dump_private_key(tuple(private_key)))
+    print(f"(d, n) 私钥: {'✓' if plain_private == private_key and not plain_private.has_crt else '✗'}")
+    _, multi_private = RSA(key_size=256, num_primes=3).generate_keys(verbose=False)
+    loaded_multi = load_private_key(dump_private_key(multi_private))
+    print(f"3个素因子的私钥: {'✓' if loaded_multi.primes == multi_private.primes else '✗'}")
+    try:
+        load_public_key(private_data)
+        print("类型检查: ✗ 未发现")
+    except ValueError as exc:
+        print(f"类型检查: ✓ {exc}")
+    
+    n = public_key[1]
+    ciphertexts = [0, 1, n - 1] + [random.randrange(n) for _ in range(1000)]
+    data = pack_ciphertexts(ciphertexts, n)
+    print(f"\n{len(ciphertexts)} 个密文打包为 {len(data)} 字节: "
+          f"{'✓' if unpack_ciphertexts(data) == ciphertexts else '✗'}")
+    
+    # 流式读取，缓冲区边界不与记录对齐
+    stream = io.BytesIO(data)
+    reader = CiphertextReader(stream)
+    reader._buffer = bytearray(1000)
+    print(f"流式读取: {'✓' if list(reader) == ciphertexts else '✗'}")
+    try:
+        list(CiphertextReader(io.BytesIO(data[:-1])))
+        print("截断检测: ✗ 未发现")
+    except ValueError as exc:
+        print(f"截断检测: ✓ {exc}")
+    
+    print("\n" + "=" * 60)
+
+
+def benchmark_rsa_binary(key_size=1024, count=200_000):
+    """
+    密文保存/加载速度测试：十进制逗号分隔文本与定宽二进制记录对比
+    :param key_size: 密钥长度
+    :param count: 密文个数
+    """
+    print("=" * 60)
+    print("RSA 密文序列化速度测试")
+    print("=" * 60)
+    
+    n = random.getrandbits(key_size) | (1 << (key_size - 1))
+    ciphertexts = [random.randrange(n) for _ in range(count)]
+    
+    start = time.perf_counter()
+    text = ",".join(str(c) for c in ciphertexts)
+    text_write = time.perf_counter() - start
+    start = time.perf_counter()
+    parsed = [int(num) for num in text.split(',')]
+    text_read = time.perf_counter() - start
+    
+    buffer = io.BytesIO()
+    start = time.perf_counter()
+    with CiphertextWriter(buffer, n) as writer:
+        writer.write_many(ciphertexts)
+    binary_write = time.perf_counter() - start
+    buffer.seek(0)
+    start = time.perf_counter()
+    loaded = list(CiphertextReader(buffer))
+    binary_read = time.perf_counter() - start
+    
+    ok = parsed == ciphertexts and loaded == ciphertexts
+    print(f"\n{count:,} 个 {key_size} 位密文 {'✓' if ok else '✗'}")
+    print(f"  十进制文本: {len(text) / (1 << 20):.1f} MB，保存 {text_write:.2f} 秒，加载 {text_read:.2f} 秒")
+    print(f"  二进制记录: {buffer.getbuffer().nbytes / (1 << 20):.1f} MB，"
+          f"保存 {binary_write:.2f} 秒，加载 {binary_read:.2f} 秒")
+    print(f"  加速比: 保存 {text_write / binary_write:.1f}，加载 {text_read / binary_read:.1f}")
+    
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    # 默认只运行测试；速度测试耗时较长，用 --benchmark 参数单独运行
+    if sys.argv[1:] == ['--benchmark']:
+        benchmark_rsa_binary()
+    else:
+        test_rsa_binary()
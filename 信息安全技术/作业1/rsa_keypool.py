@@ -0,0 +1,413 @@
+"""
+RSA 密钥对池
+后台线程为每种密钥长度预先生成若干密钥对，取走后自动补充；
+密钥池保存在本地密钥库文件中，程序重启后可以直接取用，不必重新生成。
+取出密钥对时只在取出日志（密钥库路径加 .taken 后缀）末尾追加一行模数再返回，
+加载密钥库时跳过日志中的模数，进程随后退出也不会再次取出同一密钥对；
+后台线程保存密钥库后清空已被快照覆盖的日志。
+日志追加后不调用fsync：进程崩溃不影响，操作系统崩溃或断电时最近取出的密钥对可能再次取出。
+同一密钥库同时只由一个密钥池使用（锁文件），其他进程中的密钥池只在内存中工作
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+from rsa import RSA, RSAPrivateKey, RSAPublicKey
+
+# 默认密钥库位置（保存私钥，文件权限设为仅本人可读写）
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser('~'), '.rsa_keypool.json')
+
+_STORE_VERSION = 1
+
+
+def _lock_store(path):
+    """
+    以非阻塞方式独占密钥库的锁文件，进程退出时操作系统自动释放
+    :param path: 密钥库路径
+    :return: 锁文件描述符，已被其他密钥池占用时返回None
+    """
+    fd = os.open(path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        elif msvcrt is not None:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _unlock_store(fd):
+    """释放 _lock_store 取得的锁"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+class RSAKeyPool:
+    """后台预生成并持久化的RSA密钥对池"""
+    
+    def __init__(self, key_sizes=(256,), size=4, store_path=DEFAULT_STORE_PATH, autostart=True):
+        """
+        初始化密钥池
+        :param key_sizes: 需要预生成的密钥长度，其他长度取用时直接生成
+        :param size: 每种密钥长度保持的密钥对个数
+        :param store_path: 密钥库文件路径，为None时不持久化；
+                           密钥库已被其他密钥池占用时同样不持久化（persistent 为False）
+        :param autostart: 是否立即启动后台生成线程
+        """
+        if size < 1:
+            raise ValueError("密钥池大小必须为正数")
+        self.size = size
+        self._pools = {key_size: deque() for key_size in key_sizes}
+        self._condition = threading.Condition()
+        self._thread = None
+        # 密钥库快照的序号：写盘在锁外进行，较旧的快照不能覆盖较新的快照
+        self._save_lock = threading.Lock()
+        self._snapshot_serial = 0
+        self._written_serial = 0
+        # 取出日志：上次快照之后是否追加过记录
+        self._journal_fd = None
+        self._journal_dirty = False
+        
+        self._lock_fd = _lock_store(store_path) if store_path is not None else None
+        self.store_path = store_path if self._lock_fd is not None else None
+        self.persistent = self.store_path is not None
+        if self.persistent:
+            if os.path.exists(store_path):
+                self._load()
+            self._journal_fd = os.open(store_path + '.taken',
+                                       os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        if autostart:
+            self.start()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def start(self):
+        """启动后台生成线程"""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._worker, name="RSAKeyPool", daemon=True)
+            self._thread.start()
+    
+    def close(self):
+        """
+        停止后台线程并释放密钥库
+        不等待正在生成的密钥对：后台线程生成完后发现已停止，丢弃结果退出
+        """
+        with self._condition:
+            self._thread = None
+            self._condition.notify_all()
+        if self._lock_fd is not None:
+            with self._condition:
+                snapshot = self._snapshot()
+            self._write(snapshot)
+            with self._condition:
+                # 释放密钥库后取出的密钥对无法记录，此后只在当前线程直接生成
+                self.store_path = None
+                for pool in self._pools.values():
+                    pool.clear()
+                os.close(self._journal_fd)
+                self._journal_fd = None
+            _unlock_store(self._lock_fd)
+            self._lock_fd = None
+    
+    def available(self, key_size):
+        """
+        当前可直接取用的密钥对个数
+        :param key_size: 密钥长度
+        :return: 个数
+        """
+        with self._condition:
+            return len(self._pools.get(key_size, ()))
+    
+    def wait_ready(self, timeout=None):
+        """
+        等待所有密钥长度的密钥池补满
+        :param timeout: 最长等待秒数，None表示一直等待
+        :return: 是否已补满
+        """
+        with self._condition:
+            return self._condition.wait_for(self._is_full, timeout)
+    
+    def take(self, key_size):
+        """
+        取出一个密钥对，池中没有或不是预生成的密钥长度时在当前线程直接生成
+        从池中取出时，模数追加到取出日志后才返回，避免重启后再次取出
+        :param key_size: 密钥长度
+        :return: (public_key, private_key)
+        """
+        with self._condition:
+            pool = self._pools.get(key_size)
+            key_pair = pool.popleft() if pool else None
+            if key_pair is not None and self._journal_fd is not None:
+                os.write(self._journal_fd, b'%x\n' % key_pair[0][1])
+                self._journal_dirty = True
+            self._condition.notify_all()
+        
+        if key_pair is None:
+            key_pair = RSA(key_size=key_size).generate_keys(verbose=False)
+        return key_pair
+    
+    def take_rsa(self, key_size):
+        """
+        取出一个密钥对并装入RSA对象
+        :param key_size: 密钥长度
+        :return: 已设置公钥与私钥的RSA对象
+        """
+        rsa = RSA(key_size=key_size)
+        rsa.public_key, rsa.private_key = self.take(key_size)
+        return rsa
+    
+    def _is_full(self):
+        """所有密钥长度都已补满（调用时需持有锁）"""
+        return all(len(pool) >= self.size for pool in self._pools.values())
+    
+    def _next_size(self):
+        """需要补充的密钥长度，都已补满时返回None（调用时需持有锁）"""
+        for key_size, pool in self._pools.items():
+            if len(pool) < self.size:
+                return key_size
+        return None
+    
+    def _worker(self):
+        """后台线程：逐个补充密钥对，每补充一个保存一次密钥库；close() 之后退出"""
+        current = threading.current_thread()
+        while True:
+            with self._condition:
+                while self._thread is current and self._next_size() is None:
+                    self._condition.wait()
+                if self._thread is not current:
+                    return
+                key_size = self._next_size()
+            
+            key_pair = RSA(key_size=key_size).generate_keys(verbose=False)
+            with self._condition:
+                if self._thread is not current:
+                    return
+                self._pools[key_size].append(key_pair)
+                snapshot = self._snapshot()
+                self._condition.notify_all()
+            self._write(snapshot)
+    
+    def _load(self):
+        """
+        从密钥库文件加载预生成长度的密钥对，跳过取出日志中的模数
+        文件损坏或版本不符时移到一边（文件名加 .corrupt 后缀），以空密钥池启动
+        """
+        taken = set()
+        try:
+            with open(self.store_path + '.taken', 'r', encoding='ascii') as f:
+                for line in f:
+                    # 追加时进程中断可能留下不完整的一行，该密钥对并未返回给调用者
+                    try:
+                        taken.add(int(line, 16))
+                    except ValueError:
+                        pass
+        except FileNotFoundError:
+            pass
+        
+        try:
+            with open(self.store_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if not isinstance(state, dict) or state.get('version') != _STORE_VERSION:
+                raise ValueError("不支持的密钥库版本")
+            pools = {}
+            for key_size, records in state['keys'].items():
+                pool = pools.setdefault(int(key_size), deque())
+                for record in records:
+                    if record['n'] in taken:
+                        continue
+                    public_key = RSAPublicKey(record['e'], record['n'])
+                    private_key = RSAPrivateKey(record['d'], record['n'], record['p'], record['q'],
+                                                *record.get('other_primes', ()))
+                    pool.append((public_key, private_key))
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as exc:
+            aside = f"{self.store_path}.corrupt-{time.strftime('%Y%m%d%H%M%S')}"
+            os.replace(self.store_path, aside)
+            print(f"警告: 密钥库无法读取（{exc}），已移至 {aside}，以空密钥池启动", file=sys.stderr)
+            return
+        for key_size, pool in pools.items():
+            if key_size in self._pools:
+                self._pools[key_size].extend(pool)
+    
+    def _snapshot(self):
+        """
+        生成当前密钥库内容的快照（调用时需持有锁）
+        :return: (序号, 密钥库路径, 密钥库内容)，不持久化时内容为None
+        """
+        if self.store_path is None:
+            return 0, None, None
+        self._snapshot_serial += 1
+        self._journal_dirty = False
+        state = {
+            'version': _STORE_VERSION,
+            'keys': {
+                str(key_size): [
+                    {'e': public_key[0], 'n': public_key[1], 'd': private_key.d,
+                     'p': private_key.p, 'q': private_key.q, 'other_primes': private_key.primes[2:]}
+                    for public_key, private_key in pool
+                ]
+                for key_size, pool in self._pools.items()
+            },
+        }
+        return self._snapshot_serial, self.store_path, state
+    
+    def _write(self, snapshot):
+        """
+        把快照写入密钥库文件（不持有密钥池的锁；先写临时文件再替换）
+        已写入更新的快照时跳过，更新的快照同样包含这次的修改；
+        写入后若快照之后没有再取出密钥对，日志中的记录都已被快照覆盖，清空日志
+        :param snapshot: _snapshot 的结果
+        """
+        serial, path, state = snapshot
+        if state is None:
+            return
+        data = json.dumps(state)
+        with self._save_lock:
+            if serial <= self._written_serial:
+                return
+            temp_path = path + '.tmp'
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+            self._written_serial = serial
+            with self._condition:
+                if (serial == self._snapshot_serial and not self._journal_dirty
+                        and self._journal_fd is not None):
+                    os.ftruncate(self._journal_fd, 0)
+
+
+def test_key_pool():
+    """测试RSA密钥对池"""
+    print("=" * 60)
+    print("RSA 密钥对池测试")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "keystore.json")
+        
+        start = time.perf_counter()
+        with RSAKeyPool(key_sizes=(256,), size=3, store_path=path) as pool:
+            ready = pool.wait_ready(timeout=60)
+            print(f"\n后台补满密钥池: {'✓' if ready else '✗'} 用时 {time.perf_counter() - start:.2f} 秒")
+            
+            start = time.perf_counter()
+            public_key, private_key = pool.take(256)
+            elapsed = time.perf_counter() - start
+            print(f"取出密钥对: {elapsed * 1e6:.0f} 微秒")
+            rsa = RSA(key_size=256)
+            rsa.public_key, rsa.private_key = public_key, private_key
+            # 取出后立即读盘：模数已记入取出日志（进程此时退出也不会再次取出）
+            with open(path, 'r', encoding='utf-8') as f:
+                stored = [record['n'] for record in json.load(f)['keys']['256']]
+            with open(path + '.taken', 'r', encoding='ascii') as f:
+                journal = [int(line, 16) for line in f]
+            print(f"取出时已记入取出日志: {'✓' if public_key[1] in journal else '✗'}")
+            
+            # 同一密钥库的第二个密钥池不会与第一个取出相同的密钥对
+            with RSAKeyPool(key_sizes=(256,), size=1, store_path=path, autostart=False) as other:
+                other_key = other.take(256)[0]
+                print(f"密钥库只有一个使用者: {'✓' if not other.persistent and pool.persistent else '✗'}")
+                print(f"第二个密钥池不取出密钥库中的密钥: "
+                      f"{'✓' if other_key[1] not in stored and other_key != rsa.public_key else '✗'}")
+            ok = rsa.decrypt(rsa.encrypt("Hello Pool!")) == "Hello Pool!"
+            print(f"取出的密钥可用: {'✓' if ok else '✗'}")
+            taken = rsa.public_key
+            refilled = pool.wait_ready(timeout=60)
+            print(f"取出后自动补充: {'✓' if refilled else '✗'} 当前 {pool.available(256)} 个")
+            # 补充后保存的密钥库已不含取出的密钥对，日志随之清空（补满时写盘可能尚未完成）
+            deadline = time.monotonic() + 5
+            while os.path.getsize(path + '.taken') and time.monotonic() < deadline:
+                time.sleep(0.01)
+            with open(path, 'r', encoding='utf-8') as f:
+                stored = [record['n'] for record in json.load(f)['keys']['256']]
+            compacted = taken[1] not in stored and os.path.getsize(path + '.taken') == 0
+            print(f"保存密钥库后清空取出日志: {'✓' if compacted else '✗'}")
+            
+            # 未配置的密钥长度直接生成，不加入后台补充，也不写入密钥库
+            pool.take(128)
+            with open(path, 'r', encoding='utf-8') as f:
+                sizes = list(json.load(f)['keys'])
+            print(f"其他密钥长度不加入密钥池: {'✓' if pool.available(128) == 0 and sizes == ['256'] else '✗'}")
+        
+        # 重启后从密钥库加载，不需要等待生成
+        start = time.perf_counter()
+        with RSAKeyPool(key_sizes=(256,), size=3, store_path=path, autostart=False) as pool:
+            warm = pool.available(256)
+            keys = [pool.take(256)[0] for _ in range(warm)]
+            elapsed = time.perf_counter() - start
+        print(f"重启后加载: {'✓' if warm == 3 else '✗'} {warm} 个，用时 {elapsed * 1000:.1f} ms")
+        print(f"已取出的密钥不再出现: {'✓' if taken not in keys else '✗'}")
+        print(f"每个密钥只取出一次: {'✓' if len(set(keys)) == len(keys) else '✗'}")
+        
+        # 取出日志中的密钥对重启后不再加载（模拟取出后进程未保存密钥库就退出）
+        with open(path + '.taken', 'a', encoding='ascii') as f:
+            f.write(f"{keys[0][1]:x}\n")
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        state['keys']['256'].append({'e': keys[0][0], 'n': keys[0][1], 'd': 0, 'p': 0, 'q': 0})
+        state['keys']['512'] = state['keys']['256']
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        with RSAKeyPool(key_sizes=(256,), size=3, store_path=path, autostart=False) as pool:
+            replayed = pool.available(256) == 0 and pool.available(512) == 0
+        print(f"重启时跳过取出日志中的密钥: {'✓' if replayed else '✗'}")
+        
+        # 关闭时不等待正在生成的密钥对
+        with RSAKeyPool(key_sizes=(1024,), size=1, store_path=None) as pool:
+            time.sleep(0.05)
+            start = time.perf_counter()
+        elapsed = time.perf_counter() - start
+        print(f"关闭不等待后台生成: {'✓' if elapsed < 0.1 else '✗'} 用时 {elapsed * 1000:.1f} ms")
+        
+        # 池为空时在当前线程直接生成
+        with RSAKeyPool(key_sizes=(), size=1, store_path=None, autostart=False) as pool:
+            rsa = pool.take_rsa(128)
+            print(f"池为空时直接生成: {'✓' if rsa.private_key.has_crt else '✗'}")
+        
+        # 密钥库损坏或版本不符：移到一边，以空密钥池启动
+        for name, content in (("损坏的密钥库", "{not json"), ("版本不符的密钥库", '{"version": 99, "keys": {}}')):
+            broken = os.path.join(workdir, "broken.json")
+            with open(broken, 'w', encoding='utf-8') as f:
+                f.write(content)
+            with RSAKeyPool(key_sizes=(256,), size=1, store_path=broken, autostart=False) as pool:
+                empty = pool.available(256) == 0
+            aside = [entry for entry in os.listdir(workdir) if entry.startswith("broken.json.corrupt-")]
+            print(f"{name}: {'✓' if empty and aside else '✗'} 已移至 {aside}")
+            for entry in aside:
+                os.remove(os.path.join(workdir, entry))
+    
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    test_key_pool()
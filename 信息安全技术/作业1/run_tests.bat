@@ -7,19 +7,47 @@ echo.
 echo 开始运行测试程序...
 echo.
 
-echo [1/4] 运行 DES 算法测试...
+echo [1/11] 运行 DES 算法测试...
 python des.py
 echo.
 
-echo [2/4] 运行 RSA 算法测试...
+echo [2/11] 运行 RSA 算法测试...
 python rsa.py
 echo.
 
-echo [3/4] 运行 SHA-1 算法测试...
+echo [3/11] 运行 SHA-1 算法测试...
 python sha1.py
 echo.
 
-echo [4/4] 运行综合测试...
+echo [4/11] 运行 DES 多进程加解密测试...
+python des_parallel.py
+echo.
+
+echo [5/11] 运行 DES 文件加解密测试...
+python des_file.py
+echo.
+
+echo [6/11] 运行 DES 密钥搜索测试...
+python des_keysearch.py
+echo.
+
+echo [7/11] 运行 DES 加密容器测试...
+python des_container.py
+echo.
+
+echo [8/11] 运行 RSA 密钥对池测试...
+python rsa_keypool.py
+echo.
+
+echo [9/11] 运行 RSA 二进制序列化测试...
+python rsa_binary.py
+echo.
+
+echo [10/11] 运行 RSA 共享素因子审计测试...
+python rsa_audit.py
+echo.
+
+echo [11/11] 运行综合测试...
 python main.py
 echo.
 
@@ -3,18 +3,65 @@ SHA-1 (Secure Hash Algorithm 1) 算法手动实现
 不使用任何第三方加密库，从底层实现SHA-1算法
 """
 
+import os
+import struct
+import sys
+import tempfile
+import time
+
+# hash_file 每次读入的字节数
+_FILE_CHUNK = 8192
+
+_MASK = 0xffffffff
+# 扩展后的80个字按大端序解析
+_SCHEDULE = struct.Struct('>80I')
+
+
+def _lanes(count, value):
+    """把count个32位字都设为value，拼成一个大整数（用于按字并行的掩码）"""
+    return sum(value << (32 * i) for i in range(count))
+
+
+# 消息扩展一次并行计算3个字/6个字时使用的掩码：整体掩码、循环左移后的高位部分与低位部分
+_LANES3 = _lanes(3, _MASK)
+_LANES3_HIGH = _lanes(3, 0xfffffffe)
+_LANES3_LOW = _lanes(3, 1)
+_LANES6 = _lanes(6, _MASK)
+_LANES6_HIGH = _lanes(6, 0xfffffffc)
+_LANES6_LOW = _lanes(6, 3)
+
 
 class SHA1:
-    """SHA-1哈希算法实现类"""
+    """
+    SHA-1哈希算法实现类
+    与 hashlib 用法一致：update() 分段输入消息，digest()/hexdigest() 取得结果，
+    对象只保存链接变量和不足一块的剩余数据
+    """
+    
+    name = 'sha1'
+    digest_size = 20
+    block_size = 64
     
-    def __init__(self):
-        """初始化SHA-1对象"""
+    def __init__(self, message=None):
+        """
+        初始化SHA-1对象
+        :param message: 可选的初始消息，相当于创建后调用一次 update()
+        """
+        self._reset()
+        if message is not None:
+            self.update(message)
+    
+    def _reset(self):
+        """恢复初始状态"""
         # 初始哈希值 (5个32位字)
         self.h0 = 0x67452301
         self.h1 = 0xEFCDAB89
         self.h2 = 0x98BADCFE
         self.h3 = 0x10325476
         self.h4 = 0xC3D2E1F0
+        # 未满一块的剩余数据与已输入的总字节数
+        self._buffer = bytearray()
+        self._length = 0
     
     def _left_rotate(self, n, b):
         """
@@ -25,27 +72,98 @@ class SHA1:
         """
         return ((n << b) | (n >> (32 - b))) & 0xffffffff
     
-    def _pad_message(self, message):
+    def _padding(self, msg_len):
+        """
+        计算填充部分
+        :param msg_len: 原始消息字节数
+        :return: 0x80、若干0（使得消息长度 ≡ 448 (mod 512)）与64位大端序的消息位数
+        """
+        return b'\x80' + b'\x00' * ((55 - msg_len) % 64) + (msg_len * 8).to_bytes(8, byteorder='big')
+    
+    def _process_chunk(self, chunk):
         """
-        对消息进行填充
-        :param message: 原始消息字节串
-        :return: 填充后的消息
+        处理一个512位的消息块（优化实现）
+        与 _process_chunk_simple 结果相同：消息扩展把多个字放在一个大整数中并行计算，
+        最后一次 struct 解析出80个字；80轮按轮函数分成四段循环，循环内没有分支，
+        循环移位直接展开，只读写局部变量，最后才写回链接变量
+        :param chunk: 512位(64字节)的消息块
         """
-        msg_len = len(message)
-        message += b'\x80'
+        # 扩展为80个字：schedule 中最新的字在最低32位，每次在低位追加新算出的字
+        # w[i] = rotl1(w[i-3] ^ w[i-8] ^ w[i-14] ^ w[i-16])，依赖前3个字，每次算3个，共算到第33个字
+        schedule = int.from_bytes(chunk, 'big')
+        for _ in range(6):
+            x = (schedule ^ (schedule >> 160) ^ (schedule >> 352) ^ (schedule >> 416)) & _LANES3
+            schedule = (schedule << 96) | ((x << 1) & _LANES3_HIGH) | ((x >> 31) & _LANES3_LOW)
+        # i >= 32 时等价于 w[i] = rotl2(w[i-6] ^ w[i-16] ^ w[i-28] ^ w[i-32])，每次算6个，算到第81个字
+        for _ in range(8):
+            x = (schedule ^ (schedule >> 320) ^ (schedule >> 704) ^ (schedule >> 832)) & _LANES6
+            schedule = (schedule << 192) | ((x << 2) & _LANES6_HIGH) | ((x >> 30) & _LANES6_LOW)
+        # 去掉多算的最后两个字
+        w = _SCHEDULE.unpack((schedule >> 64).to_bytes(320, 'big'))
         
-        # 填充0，使得消息长度 ≡ 448 (mod 512)
-        while len(message) % 64 != 56:
-            message += b'\x00'
+        a = h0 = self.h0
+        b = h1 = self.h1
+        c = h2 = self.h2
+        d = h3 = self.h3
+        e = h4 = self.h4
         
-        # 添加原始消息长度（以位为单位，64位大端序）
-        message += (msg_len * 8).to_bytes(8, byteorder='big')
+        # 每轮只更新两个变量：新的a写入原来e的位置，b循环左移30位；
+        # 其余变量不搬动，而是在下一轮换一个角色使用，五轮后各变量回到原来的角色
+        # a始终小于2^32，左移5位后不必先截断，与其他项相加后统一取低32位
+        for i in range(0, 20, 5):
+            e = (((a << 5) | (a >> 27)) + (d ^ (b & (c ^ d))) + e + 0x5A827999 + w[i]) & _MASK
+            b = ((b << 30) | (b >> 2)) & _MASK
+            d = (((e << 5) | (e >> 27)) + (c ^ (a & (b ^ c))) + d + 0x5A827999 + w[i + 1]) & _MASK
+            a = ((a << 30) | (a >> 2)) & _MASK
+            c = (((d << 5) | (d >> 27)) + (b ^ (e & (a ^ b))) + c + 0x5A827999 + w[i + 2]) & _MASK
+            e = ((e << 30) | (e >> 2)) & _MASK
+            b = (((c << 5) | (c >> 27)) + (a ^ (d & (e ^ a))) + b + 0x5A827999 + w[i + 3]) & _MASK
+            d = ((d << 30) | (d >> 2)) & _MASK
+            a = (((b << 5) | (b >> 27)) + (e ^ (c & (d ^ e))) + a + 0x5A827999 + w[i + 4]) & _MASK
+            c = ((c << 30) | (c >> 2)) & _MASK
+        for i in range(20, 40, 5):
+            e = (((a << 5) | (a >> 27)) + (b ^ c ^ d) + e + 0x6ED9EBA1 + w[i]) & _MASK
+            b = ((b << 30) | (b >> 2)) & _MASK
+            d = (((e << 5) | (e >> 27)) + (a ^ b ^ c) + d + 0x6ED9EBA1 + w[i + 1]) & _MASK
+            a = ((a << 30) | (a >> 2)) & _MASK
+            c = (((d << 5) | (d >> 27)) + (e ^ a ^ b) + c + 0x6ED9EBA1 + w[i + 2]) & _MASK
+            e = ((e << 30) | (e >> 2)) & _MASK
+            b = (((c << 5) | (c >> 27)) + (d ^ e ^ a) + b + 0x6ED9EBA1 + w[i + 3]) & _MASK
+            d = ((d << 30) | (d >> 2)) & _MASK
+            a = (((b << 5) | (b >> 27)) + (c ^ d ^ e) + a + 0x6ED9EBA1 + w[i + 4]) & _MASK
+            c = ((c << 30) | (c >> 2)) & _MASK
+        for i in range(40, 60, 5):
+            e = (((a << 5) | (a >> 27)) + ((b & c) | (d & (b | c))) + e + 0x8F1BBCDC + w[i]) & _MASK
+            b = ((b << 30) | (b >> 2)) & _MASK
+            d = (((e << 5) | (e >> 27)) + ((a & b) | (c & (a | b))) + d + 0x8F1BBCDC + w[i + 1]) & _MASK
+            a = ((a << 30) | (a >> 2)) & _MASK
+            c = (((d << 5) | (d >> 27)) + ((e & a) | (b & (e | a))) + c + 0x8F1BBCDC + w[i + 2]) & _MASK
+            e = ((e << 30) | (e >> 2)) & _MASK
+            b = (((c << 5) | (c >> 27)) + ((d & e) | (a & (d | e))) + b + 0x8F1BBCDC + w[i + 3]) & _MASK
+            d = ((d << 30) | (d >> 2)) & _MASK
+            a = (((b << 5) | (b >> 27)) + ((c & d) | (e & (c | d))) + a + 0x8F1BBCDC + w[i + 4]) & _MASK
+            c = ((c << 30) | (c >> 2)) & _MASK
+        for i in range(60, 80, 5):
+            e = (((a << 5) | (a >> 27)) + (b ^ c ^ d) + e + 0xCA62C1D6 + w[i]) & _MASK
+            b = ((b << 30) | (b >> 2)) & _MASK
+            d = (((e << 5) | (e >> 27)) + (a ^ b ^ c) + d + 0xCA62C1D6 + w[i + 1]) & _MASK
+            a = ((a << 30) | (a >> 2)) & _MASK
+            c = (((d << 5) | (d >> 27)) + (e ^ a ^ b) + c + 0xCA62C1D6 + w[i + 2]) & _MASK
+            e = ((e << 30) | (e >> 2)) & _MASK
+            b = (((c << 5) | (c >> 27)) + (d ^ e ^ a) + b + 0xCA62C1D6 + w[i + 3]) & _MASK
+            d = ((d << 30) | (d >> 2)) & _MASK
+            a = (((b << 5) | (b >> 27)) + (c ^ d ^ e) + a + 0xCA62C1D6 + w[i + 4]) & _MASK
+            c = ((c << 30) | (c >> 2)) & _MASK
         
-        return message
+        self.h0 = (h0 + a) & _MASK
+        self.h1 = (h1 + b) & _MASK
+        self.h2 = (h2 + c) & _MASK
+        self.h3 = (h3 + d) & _MASK
+        self.h4 = (h4 + e) & _MASK
     
-    def _process_chunk(self, chunk):
+    def _process_chunk_simple(self, chunk):
         """
-        处理一个512位的消息块
+        处理一个512位的消息块（逐轮按定义计算的原实现，用于对照）
         :param chunk: 512位(64字节)的消息块
         """
         # 将块分成16个32位的字
@@ -93,50 +211,97 @@ class SHA1:
         self.h3 = (self.h3 + d) & 0xffffffff
         self.h4 = (self.h4 + e) & 0xffffffff
     
-    def hash(self, message):
+    def update(self, message):
         """
-        计算消息的SHA-1哈希值
-        :param message: 输入消息（字符串或字节串）
-        :return: 160位哈希值（十六进制字符串）
+        输入一段消息，凑满的512位块立即处理，剩余数据留到下次
+        :param message: 消息片段（字符串按UTF-8编码，或字节串、bytearray、memoryview）
         """
-        # 重置哈希值
-        self.h0 = 0x67452301
-        self.h1 = 0xEFCDAB89
-        self.h2 = 0x98BADCFE
-        self.h3 = 0x10325476
-        self.h4 = 0xC3D2E1F0
-        
-        # 将字符串转换为字节
         if isinstance(message, str):
             message = message.encode('utf-8')
-        
-        # 填充消息
-        padded_message = self._pad_message(message)
-        
-        # 处理每个512位块
-        for i in range(0, len(padded_message), 64):
-            self._process_chunk(padded_message[i:i+64])
+        with memoryview(message) as view:
+            view = view.cast('B')
+            self._length += len(view)
+            start = 0
+            
+            # 先补满上次剩下的不完整块
+            buffer = self._buffer
+            if buffer:
+                start = min(64 - len(buffer), len(view))
+                buffer += view[:start]
+                if len(buffer) < 64:
+                    return
+                self._process_chunk(buffer)
+                buffer.clear()
+            
+            # 直接处理完整块，不复制数据
+            end = len(view) - (len(view) - start) % 64
+            for i in range(start, end, 64):
+                self._process_chunk(view[i:i + 64])
+            buffer += view[end:]
+    
+    def copy(self):
+        """
+        复制当前状态，可用于计算有共同前缀的多个消息的哈希值
+        :return: 新的SHA1对象
+        """
+        other = SHA1.__new__(SHA1)
+        other.h0, other.h1, other.h2, other.h3, other.h4 = self.h0, self.h1, self.h2, self.h3, self.h4
+        other._buffer = bytearray(self._buffer)
+        other._length = self._length
+        return other
+    
+    def digest(self):
+        """
+        取得目前已输入消息的哈希值，不影响继续 update()
+        :return: 20字节哈希值
+        """
+        final = self.copy()
+        tail = final._buffer + final._padding(final._length)
+        for i in range(0, len(tail), 64):
+            final._process_chunk(tail[i:i + 64])
         
         # 生成最终哈希值
-        hash_value = (
-            self.h0.to_bytes(4, byteorder='big') +
-            self.h1.to_bytes(4, byteorder='big') +
-            self.h2.to_bytes(4, byteorder='big') +
-            self.h3.to_bytes(4, byteorder='big') +
-            self.h4.to_bytes(4, byteorder='big')
+        return (
+            final.h0.to_bytes(4, byteorder='big') +
+            final.h1.to_bytes(4, byteorder='big') +
+            final.h2.to_bytes(4, byteorder='big') +
+            final.h3.to_bytes(4, byteorder='big') +
+            final.h4.to_bytes(4, byteorder='big')
         )
-        
-        return hash_value.hex()
     
-    def hash_file(self, filename):
+    def hexdigest(self):
+        """
+        取得目前已输入消息的哈希值
+        :return: 160位哈希值（十六进制字符串）
+        """
+        return self.digest().hex()
+    
+    def hash(self, message):
+        """
+        计算消息的SHA-1哈希值（会清除此前 update() 输入的内容）
+        :param message: 输入消息（字符串或字节串）
+        :return: 160位哈希值（十六进制字符串）
+        """
+        self._reset()
+        self.update(message)
+        return self.hexdigest()
+    
+    def hash_file(self, filename, chunk_size=_FILE_CHUNK):
         """
-        计算文件的SHA-1哈希值
+        计算文件的SHA-1哈希值，分块读入同一个缓冲区，内存占用与文件大小无关
         :param filename: 文件路径
+        :param chunk_size: 每次读入的字节数
         :return: 160位哈希值（十六进制字符串）
         """
-        with open(filename, 'rb') as f:
-            content = f.read()
-        return self.hash(content)
+        self._reset()
+        buffer = bytearray(chunk_size)
+        with open(filename, 'rb') as f, memoryview(buffer) as view:
+            while True:
+                size = f.readinto(buffer)
+                if not size:
+                    break
+                self.update(view[:size])
+        return self.hexdigest()
 
 
 def test_sha1():
@@ -219,8 +384,81 @@ def test_sha1():
     print(f"'Test'的哈希: {hash8b}")
     print(f"验证: {'✓ 不同' if hash8a != hash8b else '✗ 相同（错误）'}")
     
+    # 分段输入
+    print("\n测试9: 分段输入 update()")
+    print("-" * 60)
+    message9 = "The quick brown fox jumps over the lazy dog".encode('utf-8')
+    ok = True
+    for step in (1, 3, 7, 20, 63, 64, 65):
+        incremental = SHA1()
+        for i in range(0, len(message9), step):
+            incremental.update(message9[i:i + step])
+        ok = ok and incremental.hexdigest() == '2fd4e1c67a2d28fced849ee1bb76e7391b93eb12'
+    print(f"不同分段长度结果一致: {'✓ 通过' if ok else '✗ 失败'}")
+    prefix = SHA1("The quick brown fox ")
+    branch = prefix.copy()
+    branch.update("jumps over the lazy dog")
+    ok = (branch.hexdigest() == '2fd4e1c67a2d28fced849ee1bb76e7391b93eb12'
+          and prefix.hexdigest() == sha1.hash('The quick brown fox '))
+    print(f"copy() 后分别输入: {'✓ 通过' if ok else '✗ 失败'}")
+    
+    # 文件哈希
+    print("\n测试10: 文件哈希（一百万个'a'）")
+    print("-" * 60)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "million_a.txt")
+        with open(path, 'wb') as f:
+            f.write(b'a' * 1_000_000)
+        hash10 = sha1.hash_file(path)
+    print(f"SHA-1: {hash10}")
+    print("预期: 34aa973cd4c4daa4f61eeb2bdbad27316534016f")
+    print(f"验证: {'✓ 通过' if hash10 == '34aa973cd4c4daa4f61eeb2bdbad27316534016f' else '✗ 失败'}")
+    
+    print("\n" + "=" * 60)
+
+
+def benchmark_sha1(size=1 << 20):
+    """
+    SHA-1吞吐量测试：优化的压缩函数与逐轮按定义计算的原实现对比
+    :param size: 消息字节数
+    """
+    print("=" * 60)
+    print("SHA-1 吞吐量测试")
+    print("=" * 60)
+    
+    data = os.urandom(size)
+    blocks = [data[i:i + 64] for i in range(0, size, 64)]
+    
+    reference = SHA1()
+    start = time.perf_counter()
+    for block in blocks:
+        reference._process_chunk_simple(block)
+    simple_elapsed = time.perf_counter() - start
+    
+    optimized = SHA1()
+    start = time.perf_counter()
+    for block in blocks:
+        optimized._process_chunk(block)
+    elapsed = time.perf_counter() - start
+    same = (optimized.h0, optimized.h1, optimized.h2, optimized.h3, optimized.h4) == \
+        (reference.h0, reference.h1, reference.h2, reference.h3, reference.h4)
+    
+    print(f"\n{size >> 20} MB 消息（{len(blocks)} 个块）:")
+    print(f"  原实现: {size / simple_elapsed / (1 << 20):.2f} MB/s")
+    print(f"  优化实现: {size / elapsed / (1 << 20):.2f} MB/s {'✓ 结果一致' if same else '✗ 结果不一致'}")
+    print(f"  加速比: {simple_elapsed / elapsed:.2f}")
+    
+    start = time.perf_counter()
+    SHA1().update(data)
+    elapsed = time.perf_counter() - start
+    print(f"  update() 整体: {size / elapsed / (1 << 20):.2f} MB/s")
+    
     print("\n" + "=" * 60)
 
 
 if __name__ == "__main__":
-    test_sha1()
+    # 默认只运行测试；速度测试耗时较长，用 --benchmark 参数单独运行
+    if sys.argv[1:] == ['--benchmark']:
+        benchmark_sha1()
+    else:
+        test_sha1()